@@ -2,13 +2,16 @@
 """Interactive terminal interface for code analysis."""
 
 import sys
-import tempfile
-import os
-from pathlib import Path
 
-from src.indexer.code_indexer import CodeIndexer
-from src.search.semantic_search import SemanticSearch
-from src.utils.display_helpers import format_code_preview
+from src.utils.language_detector import LanguageDetector
+
+
+LANG_EMOJI = {
+    'python': '🐍',
+    'javascript': '📜',
+    'java': '☕',
+    'go': '🔷'
+}
 
 
 def main():
@@ -20,6 +23,13 @@ def main():
     print("📚 Supported Languages: Python, JavaScript, TypeScript, Java, Go")
     print()
     
+    # Heavy imports (ChromaDB, provider SDKs) happen after the banner is shown
+    from src.indexer.code_indexer import CodeIndexer
+    from src.indexer.parse_cache import clear_parse_cache
+    from src.search.semantic_search import SemanticSearch
+    from src.utils.display_helpers import format_code_preview
+    from src.utils.similarity import similarity_scores
+    
     # Initialize
     indexer = CodeIndexer()
     search_engine = SemanticSearch()
@@ -30,7 +40,8 @@ def main():
         print("-" * 70)
         print("Enter 'search' to search, or paste your code: ", end="")
         
-        first_line = input().strip().lower()
+        raw_first_line = input()
+        first_line = raw_first_line.strip().lower()
         
         if first_line in ['quit', 'exit', 'q']:
             print("\n👋 Goodbye!")
@@ -39,11 +50,10 @@ def main():
         if first_line == 'clear':
             # Clear database command
             try:
+                # Entries are deleted from the existing collection, so the indexer's
+                # vector store still points at it and needs no re-initialization
                 search_engine.vector_store.clear()
-                # Re-initialize indexer and search engine to get fresh collection reference
-                # This fixes "Collection does not exist" error
-                indexer = CodeIndexer()
-                search_engine = SemanticSearch()
+                clear_parse_cache()
                 print("\n🧹 Database cleared successfully!\n")
             except Exception as e:
                 print(f"\n❌ Error clearing database: {e}\n")
@@ -66,18 +76,12 @@ def main():
                 if results:
                     print(f"\n✅ Found {len(results)} results:\n")
                     
-                    for i, result in enumerate(results, 1):
+                    similarities = similarity_scores([r.get("distance") for r in results]) * 100
+                    
+                    for i, (result, similarity) in enumerate(zip(results, similarities), 1):
                         metadata = result["metadata"]
-                        distance = result.get("distance", 0)
-                        similarity = (1 - distance / 2) * 100 if distance is not None else 100
                         
-                        lang_emoji = {
-                            'python': '🐍',
-                            'javascript': '📜',
-                            'java': '☕',
-                            'go': '🔷'
-                        }
-                        emoji = lang_emoji.get(metadata.get('language', ''), '📄')
+                        emoji = LANG_EMOJI.get(metadata.get('language', ''), '📄')
                         
                         print(f"{i}. {emoji} {metadata['name']} ({metadata['type']}) - {similarity:.1f}% match")
                         print(f"   Language: {metadata.get('language', 'unknown')}")
@@ -123,22 +127,15 @@ def main():
         print("-" * 70)
         
         try:
-            lines = [first_line]  # Include the first line
-            while True:
-                try:
-                    line = input()
-                    lines.append(line)
-                except EOFError:
-                    break
-            
-            code = '\n'.join(lines)
+            # Read the rest of the paste in one go; read() returns on EOF (Ctrl+D)
+            rest = sys.stdin.read()
+            code = raw_first_line + '\n' + rest
             
             if not code.strip():
                 print("\n❌ No code provided.\n")
                 continue
             
             # Auto-detect language
-            from src.utils.language_detector import LanguageDetector
             detected_language = LanguageDetector.detect(code)
             
             if not detected_language:
@@ -147,27 +144,12 @@ def main():
             
             print(f"\n🔍 Detected language: {detected_language.upper()}")
             
-            # Map to file extension
-            lang_map = {
-                'python': '.py',
-                'javascript': '.js',
-                'java': '.java',
-                'go': '.go'
-            }
-            
-            extension = lang_map[detected_language]
-            
-            # Save to temp file
-            with tempfile.NamedTemporaryFile(mode='w', suffix=extension, delete=False) as f:
-                f.write(code)
-                temp_file = f.name
-            
             print(f"🔍 Processing your {detected_language} code...")
             print("-" * 70)
             
             # Index the code
             try:
-                stats = indexer.index_file(temp_file)
+                stats = indexer.index_source(code, detected_language)
                 
                 print(f"\n✅ Code processed successfully!")
                 print(f"   Code units extracted: {stats['total_code_units']}")
@@ -181,12 +163,6 @@ def main():
                 
             except Exception as e:
                 print(f"\n❌ Error processing code: {e}\n")
-            finally:
-                # Clean up temp file
-                try:
-                    os.unlink(temp_file)
-                except:
-                    pass
                     
         except KeyboardInterrupt:
             print("\n\n⚠️  Input cancelled.\n")
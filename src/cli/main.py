@@ -1,13 +1,15 @@
 """Command-line interface for code analyser."""
 
+import asyncio
+
 import click
 from rich.console import Console
+from rich.markup import escape
 from rich.table import Table
 from pathlib import Path
 
-from src.indexer.code_indexer import CodeIndexer
-from src.search.semantic_search import SemanticSearch
-from src.config import settings
+# Indexer/search (and with them settings, ChromaDB and the provider SDKs) are
+# imported inside the commands so that `--help` and argument errors stay fast.
 
 console = Console()
 
@@ -28,10 +30,12 @@ def index(path):
     console.print(f"\n[bold cyan]Indexing:[/bold cyan] {path}\n")
 
     try:
+        from src.indexer.code_indexer import CodeIndexer
+
         indexer = CodeIndexer()
 
         if Path(path).is_dir():
-            stats = indexer.index_directory(path)
+            stats = asyncio.run(indexer.aindex_directory(path))
         else:
             stats = indexer.index_file(path)
 
@@ -64,6 +68,9 @@ def search(query, limit, file, type):
     console.print(f"\n[bold cyan]Searching for:[/bold cyan] '{query}'\n")
 
     try:
+        from src.search.semantic_search import SemanticSearch
+        from src.utils.similarity import similarity_scores
+
         search_engine = SemanticSearch()
         results = search_engine.search(
             query=query,
@@ -78,17 +85,29 @@ def search(query, limit, file, type):
 
         console.print(f"[bold green]Found {len(results)} results:[/bold green]\n")
 
-        for i, result in enumerate(results, 1):
+        similarities = similarity_scores([result.get("distance") for result in results]) * 100
+
+        table = Table(show_header=True, header_style="bold magenta")
+        table.add_column("#", style="dim", justify="right")
+        table.add_column("Name", style="bold")
+        table.add_column("Type", style="cyan")
+        table.add_column("File", style="dim", overflow="fold")
+        table.add_column("Similarity", style="green", justify="right")
+        table.add_column("Signature")
+
+        for i, (result, similarity) in enumerate(zip(results, similarities), 1):
             metadata = result["metadata"]
-            distance = result.get("distance", 0)
-            similarity = (1 - distance / 2) * 100 if distance is not None else 100
+            table.add_row(
+                str(i),
+                escape(metadata["name"]),
+                metadata["type"],
+                escape(f"{metadata['file_path']}:{metadata['start_line']}"),
+                f"{similarity:.1f}%",
+                escape(metadata.get("signature") or ""),
+            )
 
-            console.print(f"[bold]{i}. {metadata['name']}[/bold] ({metadata['type']})")
-            console.print(f"   [dim]File:[/dim] {metadata['file_path']}:{metadata['start_line']}")
-            console.print(f"   [dim]Similarity:[/dim] {similarity:.1f}%")
-            if metadata.get("signature"):
-                console.print(f"   [dim]Signature:[/dim] {metadata['signature']}")
-            console.print()
+        console.print(table)
+        console.print()
 
     except Exception as e:
         console.print(f"\n[bold red]✗ Error:[/bold red] {e}\n")
@@ -99,6 +118,8 @@ def search(query, limit, file, type):
 def stats():
     """Display indexing statistics."""
     try:
+        from src.indexer.code_indexer import CodeIndexer
+
         indexer = CodeIndexer()
         stats_data = indexer.get_stats()
 
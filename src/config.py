@@ -1,6 +1,8 @@
 """Configuration management using Pydantic settings."""
 
-from typing import List
+import sys
+from dataclasses import field, make_dataclass
+from typing import FrozenSet, List, Tuple
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -55,6 +57,10 @@ class Settings(BaseSettings):
         default="openai/gpt-4o-mini",
         description="OpenRouter model for generation",
     )
+    generation_hedge_delay: float = Field(
+        default=3.0,
+        description="Seconds to wait on a generation provider before also trying the next one",
+    )
     
     embedding_dimension: int = Field(
         default=1536,
@@ -70,6 +76,22 @@ class Settings(BaseSettings):
         default="code_embeddings",
         description="ChromaDB collection name",
     )
+    store_documents: bool = Field(
+        default=True,
+        description="Store searchable texts in ChromaDB (otherwise rebuilt from source files)",
+    )
+    hnsw_max_neighbors: int = Field(
+        default=16,
+        description="Links per node of the collection's HNSW index (fixed at creation)",
+    )
+    hnsw_ef_construction: int = Field(
+        default=64,
+        description="Candidate list size while building the HNSW index (fixed at creation)",
+    )
+    hnsw_ef_search: int = Field(
+        default=100,
+        description="Candidate list size of HNSW queries; higher trades speed for recall",
+    )
 
     # Logging Configuration
     log_level: str = Field(default="INFO", description="Logging level")
@@ -84,6 +106,26 @@ class Settings(BaseSettings):
         default=100,
         description="Batch size for embedding generation",
     )
+    embedding_concurrency: int = Field(
+        default=8,
+        description="Maximum number of embedding batch requests in flight",
+    )
+    embedding_max_retries: int = Field(
+        default=5,
+        description="Retries with exponential backoff when a provider is rate limited",
+    )
+    parsing_workers: int = Field(
+        default=0,
+        description="Worker processes for parsing files (0 = one per CPU, 1 = no pool)",
+    )
+    parse_cache_enabled: bool = Field(
+        default=True,
+        description="Cache parsed code units on disk, keyed by file content hash",
+    )
+    use_tree_sitter: bool = Field(
+        default=True,
+        description="Parse Go/Java/JavaScript with tree-sitter when its grammars are installed",
+    )
     supported_extensions: str = Field(
         default=".py,.js,.ts,.java,.go,.cpp,.c,.h",
         description="Comma-separated list of supported file extensions",
@@ -98,6 +140,18 @@ class Settings(BaseSettings):
         default=0.3,
         description="Minimum similarity threshold for search results (0-1)",
     )
+    search_cache_size: int = Field(
+        default=256,
+        description="Number of vector store query results kept in memory (0 disables)",
+    )
+    query_batch_size: int = Field(
+        default=32,
+        description="Maximum concurrent async queries embedded with one request",
+    )
+    query_batch_delay: float = Field(
+        default=0.005,
+        description="Seconds async queries wait for others to share their embedding request",
+    )
     
     # Statement-Level Chunking
     enable_statement_chunking: bool = Field(
@@ -109,11 +163,56 @@ class Settings(BaseSettings):
         description="Maximum statements to extract per function"
     )
 
+    # Query Embedding Cache
+    query_cache_enabled: bool = Field(
+        default=True,
+        description="Cache query embeddings to avoid repeated provider calls",
+    )
+    query_cache_size: int = Field(
+        default=1024,
+        description="Maximum number of query embeddings kept in memory",
+    )
+    query_cache_ttl_seconds: int = Field(
+        default=7 * 24 * 3600,
+        description="Time-to-live of persisted query embeddings in seconds",
+    )
+    quantize_cache: bool = Field(
+        default=True,
+        description="Store cached query embeddings as int8 instead of float32",
+    )
+
     @property
     def supported_extensions_list(self) -> List[str]:
         """Get supported extensions as a list."""
         return [ext.strip() for ext in self.supported_extensions.split(",")]
 
+    @property
+    def supported_extensions_set(self) -> FrozenSet[str]:
+        """Get supported extensions as a set for O(1) membership checks."""
+        return frozenset(Settings.supported_extensions_list.fget(self))
+
+
+def _frozen_settings_post_init(self) -> None:
+    """Compute derived values once, when the frozen settings are built."""
+    extensions = tuple(Settings.supported_extensions_list.fget(self))
+    object.__setattr__(self, "supported_extensions_list", extensions)
+    object.__setattr__(self, "supported_extensions_set", frozenset(extensions))
+
+
+# Immutable, plain-dataclass mirror of Settings. Pydantic is only used to load and
+# validate the environment once; afterwards attribute reads are ordinary lookups.
+FrozenSettings = make_dataclass(
+    "FrozenSettings",
+    [(name, info.annotation) for name, info in Settings.model_fields.items()]
+    + [
+        ("supported_extensions_list", Tuple[str, ...], field(init=False)),
+        ("supported_extensions_set", FrozenSet[str], field(init=False)),
+    ],
+    namespace={"__post_init__": _frozen_settings_post_init},
+    frozen=True,
+    **({"slots": True} if sys.version_info >= (3, 10) else {}),
+)
+
 
 # Global settings instance
-settings = Settings()
+settings = FrozenSettings(**Settings().model_dump())
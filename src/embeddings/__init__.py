@@ -1,6 +1,7 @@
 """Embeddings package."""
 
-from src.embeddings.embedding_service import EmbeddingService
+from src.embeddings.embedding_service import EmbeddingService, get_embedding_service
+from src.embeddings.query_cache import QueryEmbeddingCache
 from src.embeddings.vector_store import VectorStore
 
-__all__ = ["EmbeddingService", "VectorStore"]
+__all__ = ["EmbeddingService", "QueryEmbeddingCache", "VectorStore", "get_embedding_service"]
@@ -1,25 +1,143 @@
 """Multi-provider embedding service supporting OpenAI, Gemini, and OpenRouter."""
 
-from typing import List
+import asyncio
+import base64
+import importlib.util
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice, repeat
+from pathlib import Path
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Callable, Iterable, Iterator, Set, Tuple, Union
 from abc import ABC, abstractmethod
 
+import httpx
+import numpy as np
+import orjson
 import google.generativeai as genai
 from openai import OpenAI
 
 from src.config import settings
+from src.embeddings.query_cache import QueryEmbeddingCache
 from src.utils.logger import setup_logger
 
 logger = setup_logger("embeddings.service")
 
+# Settings are frozen after import, so derive provider selection values once
+_PROVIDER = settings.embedding_provider.lower()
+_HAS_GEMINI = bool(settings.google_api_key)
+_HAS_OPENAI = bool(settings.openai_api_key)
+_HAS_OPENROUTER = bool(settings.openrouter_api_key)
+
+# How long a failed provider is skipped before it is probed again (half-open)
+_CIRCUIT_OPEN_SECONDS = 30.0
+
+
+def _decode_json_with_orjson(response: httpx.Response) -> None:
+    """Response hook making response.json() decode with orjson instead of stdlib json."""
+    response.json = lambda **kwargs: orjson.loads(response.content)
+
+
+def _create_http_client() -> httpx.Client:
+    """Create the HTTP client used by the OpenAI-compatible providers."""
+    return httpx.Client(event_hooks={"response": [_decode_json_with_orjson]})
+
+
+def _create_async_http_client() -> httpx.AsyncClient:
+    """Create the async HTTP client used for pipelined batch requests.
+
+    HTTP/2 multiplexes the in-flight requests over a few keep-alive
+    connections; it is only enabled when the optional h2 package is installed.
+    """
+    return httpx.AsyncClient(
+        http2=importlib.util.find_spec("h2") is not None,
+        limits=httpx.Limits(max_connections=32),
+        timeout=httpx.Timeout(60.0),
+    )
+
+
+def _decode_embedding(embedding: Union[str, List[float]]) -> np.ndarray:
+    """Decode an embedding returned as base64-encoded float32 bytes (or a plain list)."""
+    if isinstance(embedding, str):
+        return np.frombuffer(base64.b64decode(embedding), dtype=np.float32)
+    return np.asarray(embedding, dtype=np.float32)
+
+
+async def _apost_embeddings(
+    client: httpx.AsyncClient, base_url: str, api_key: str, model: str, texts: List[str]
+) -> np.ndarray:
+    """POST a batch to an OpenAI-compatible /embeddings endpoint.
+
+    Args:
+        client: Async HTTP client
+        base_url: API base URL (e.g. https://api.openai.com/v1)
+        api_key: API key sent as bearer token
+        model: Embedding model name
+        texts: Texts to embed
+
+    Returns:
+        Embedding vectors in the same order as texts
+    """
+    response = await client.post(
+        f"{base_url.rstrip('/')}/embeddings",
+        headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
+        content=orjson.dumps({"model": model, "input": texts, "encoding_format": "base64"}),
+    )
+    response.raise_for_status()
+    data = orjson.loads(response.content)["data"]
+    return np.stack(
+        [_decode_embedding(d["embedding"]) for d in sorted(data, key=lambda d: d["index"])]
+    )
+
+
+def _is_rate_limit_error(error: Exception) -> bool:
+    """Check whether a provider error is an HTTP 429 / quota exhaustion."""
+    status = (
+        getattr(error, "status_code", None)
+        or getattr(error, "code", None)
+        or getattr(getattr(error, "response", None), "status_code", None)
+    )
+    return status == 429 or error.__class__.__name__ in ("RateLimitError", "ResourceExhausted")
+
 
 class BaseEmbeddingProvider(ABC):
-    """Base class for embedding providers."""
+    """Base class for embedding providers.
+
+    Subclasses store the result of _make_embed_closure() as self._embed in
+    __init__; hot paths call that plain function directly instead of going
+    through method lookup on every text.
+    """
+
+    _embed: Callable[[str], np.ndarray]
+    # Circuit breaker: time.monotonic() until which the provider is skipped
+    _open_until: float = 0.0
     
     @abstractmethod
-    def generate_embedding(self, text: str) -> List[float]:
-        """Generate embedding for a single text."""
+    def _make_embed_closure(self) -> Callable[[str], np.ndarray]:
+        """Build a function that embeds a single text."""
         pass
     
+    def generate_embedding(self, text: str) -> np.ndarray:
+        """Generate embedding for a single text."""
+        return self._embed(text)
+    
+    def generate_embeddings_batch(self, texts: List[str]) -> np.ndarray:
+        """Generate embeddings for several texts (one request per text by default)."""
+        embed = self._embed
+        return np.stack([embed(text) for text in texts])
+    
+    async def agenerate_embeddings_batch(
+        self, client: httpx.AsyncClient, texts: List[str]
+    ) -> np.ndarray:
+        """Async variant of generate_embeddings_batch.
+
+        Providers without an HTTP-level implementation run the blocking call in
+        a worker thread.
+        """
+        return await asyncio.to_thread(self.generate_embeddings_batch, texts)
+    
     @abstractmethod
     def get_dimension(self) -> int:
         """Get embedding dimension."""
@@ -32,15 +150,29 @@ class GeminiEmbeddingProvider(BaseEmbeddingProvider):
     def __init__(self, api_key: str, model: str):
         genai.configure(api_key=api_key)
         self.model = model
+        self._embed = self._make_embed_closure()
         logger.info(f"Initialized Gemini provider with model: {model}")
     
-    def generate_embedding(self, text: str) -> List[float]:
+    def _make_embed_closure(self) -> Callable[[str], np.ndarray]:
+        model = self.model
+
+        def embed(text: str) -> np.ndarray:
+            result = genai.embed_content(
+                model=model,
+                content=text,
+                task_type="retrieval_document",
+            )
+            return np.asarray(result["embedding"], dtype=np.float32)
+
+        return embed
+    
+    def generate_embeddings_batch(self, texts: List[str]) -> np.ndarray:
         result = genai.embed_content(
             model=self.model,
-            content=text,
+            content=texts,
             task_type="retrieval_document",
         )
-        return result["embedding"]
+        return np.asarray(result["embedding"], dtype=np.float32)
     
     def get_dimension(self) -> int:
         return 768  # Gemini embedding-001 dimension
@@ -50,17 +182,38 @@ class OpenAIEmbeddingProvider(BaseEmbeddingProvider):
     """OpenAI embedding provider."""
     
     def __init__(self, api_key: str, model: str):
-        self.client = OpenAI(api_key=api_key)
+        self.client = OpenAI(api_key=api_key, http_client=_create_http_client())
         self.model = model
         self._dimension = self._get_model_dimension(model)
+        self._embed = self._make_embed_closure()
         logger.info(f"Initialized OpenAI provider with model: {model}")
     
-    def generate_embedding(self, text: str) -> List[float]:
+    def _make_embed_closure(self) -> Callable[[str], np.ndarray]:
+        create = self.client.embeddings.create
+        model = self.model
+
+        def embed(text: str) -> np.ndarray:
+            response = create(model=model, input=text, encoding_format="base64")
+            return _decode_embedding(response.data[0].embedding)
+
+        return embed
+    
+    def generate_embeddings_batch(self, texts: List[str]) -> np.ndarray:
         response = self.client.embeddings.create(
             model=self.model,
-            input=text
+            input=texts,
+            encoding_format="base64",
+        )
+        return np.stack(
+            [_decode_embedding(d.embedding) for d in sorted(response.data, key=lambda d: d.index)]
+        )
+    
+    async def agenerate_embeddings_batch(
+        self, client: httpx.AsyncClient, texts: List[str]
+    ) -> np.ndarray:
+        return await _apost_embeddings(
+            client, str(self.client.base_url), self.client.api_key, self.model, texts
         )
-        return response.data[0].embedding
     
     def get_dimension(self) -> int:
         return self._dimension
@@ -81,18 +234,40 @@ class OpenRouterEmbeddingProvider(BaseEmbeddingProvider):
     def __init__(self, api_key: str, model: str):
         self.client = OpenAI(
             api_key=api_key,
-            base_url="https://openrouter.ai/api/v1"
+            base_url="https://openrouter.ai/api/v1",
+            http_client=_create_http_client(),
         )
         self.model = model
         self._dimension = 1536  # Most OpenRouter models use 1536
+        self._embed = self._make_embed_closure()
         logger.info(f"Initialized OpenRouter provider with model: {model}")
     
-    def generate_embedding(self, text: str) -> List[float]:
+    def _make_embed_closure(self) -> Callable[[str], np.ndarray]:
+        create = self.client.embeddings.create
+        model = self.model
+
+        def embed(text: str) -> np.ndarray:
+            response = create(model=model, input=text, encoding_format="base64")
+            return _decode_embedding(response.data[0].embedding)
+
+        return embed
+    
+    def generate_embeddings_batch(self, texts: List[str]) -> np.ndarray:
         response = self.client.embeddings.create(
             model=self.model,
-            input=text
+            input=texts,
+            encoding_format="base64",
+        )
+        return np.stack(
+            [_decode_embedding(d.embedding) for d in sorted(response.data, key=lambda d: d.index)]
+        )
+    
+    async def agenerate_embeddings_batch(
+        self, client: httpx.AsyncClient, texts: List[str]
+    ) -> np.ndarray:
+        return await _apost_embeddings(
+            client, str(self.client.base_url), self.client.api_key, self.model, texts
         )
-        return response.data[0].embedding
     
     def get_dimension(self) -> int:
         return self._dimension
@@ -104,46 +279,60 @@ class EmbeddingService:
     def __init__(self):
         """Initialize the embedding service with configured provider and fallback chain."""
         self.provider = self._create_provider()
-        self.fallback_providers = self._create_fallback_chain()
+        # Fallback providers are only constructed when the primary provider fails
+        self._fallback_factories = self._create_fallback_chain()
+        self._fallback_instances: Dict[str, BaseEmbeddingProvider] = {}
+        self._fallback_lock = threading.Lock()
+        # Provider whose embeddings the query cache holds; fallback results are not cached
+        self._cache_provider = self.provider
+        self.query_cache = self._create_query_cache()
+        # Query texts waiting to be embedded together by agenerate_query_embedding
+        self._pending_queries: List[Tuple[str, "asyncio.Future[np.ndarray]"]] = []
+        self._query_flush_handle: Optional[asyncio.TimerHandle] = None
+        self._query_batch_tasks: Set["asyncio.Task[None]"] = set()
+        # Keep-alive client for agenerate_embeddings_batch, bound to the loop that created it
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._async_client_loop: Optional[asyncio.AbstractEventLoop] = None
         logger.info(f"Initialized EmbeddingService with provider: {settings.embedding_provider}")
-        if self.fallback_providers:
-            logger.info(f"Fallback chain: {[p.__class__.__name__ for p in self.fallback_providers]}")
+        if self._fallback_factories:
+            logger.info(f"Fallback chain: {[name for name, _ in self._fallback_factories]}")
 
-    def _create_provider(self) -> BaseEmbeddingProvider:
-        """Create the appropriate embedding provider based on configuration."""
-        provider_name = settings.embedding_provider.lower()
-        
-        if provider_name == "gemini":
-            if not settings.google_api_key:
-                raise ValueError("Google API key not configured")
-            return GeminiEmbeddingProvider(
+    @staticmethod
+    def _provider_factory(provider_name: str) -> Optional[Callable[[], BaseEmbeddingProvider]]:
+        """Get a factory for the named provider, or None if its API key is not configured."""
+        if provider_name == "gemini" and _HAS_GEMINI:
+            return lambda: GeminiEmbeddingProvider(
                 api_key=settings.google_api_key,
                 model=settings.gemini_embedding_model
             )
-        
-        elif provider_name == "openai":
-            if not settings.openai_api_key:
-                raise ValueError("OpenAI API key not configured")
-            return OpenAIEmbeddingProvider(
+        elif provider_name == "openai" and _HAS_OPENAI:
+            return lambda: OpenAIEmbeddingProvider(
                 api_key=settings.openai_api_key,
                 model=settings.openai_embedding_model
             )
-        
-        elif provider_name == "openrouter":
-            if not settings.openrouter_api_key:
-                raise ValueError("OpenRouter API key not configured")
-            return OpenRouterEmbeddingProvider(
+        elif provider_name == "openrouter" and _HAS_OPENROUTER:
+            return lambda: OpenRouterEmbeddingProvider(
                 api_key=settings.openrouter_api_key,
                 model=settings.openrouter_embedding_model
             )
+        return None
+
+    def _create_provider(self) -> BaseEmbeddingProvider:
+        """Create the appropriate embedding provider based on configuration."""
+        provider_name = _PROVIDER
         
-        else:
+        if provider_name not in ("gemini", "openai", "openrouter"):
             raise ValueError(f"Unknown embedding provider: {provider_name}")
+
+        factory = self._provider_factory(provider_name)
+        if factory is None:
+            key_names = {"gemini": "Google", "openai": "OpenAI", "openrouter": "OpenRouter"}
+            raise ValueError(f"{key_names[provider_name]} API key not configured")
+        return factory()
     
-    def _create_fallback_chain(self) -> List[BaseEmbeddingProvider]:
-        """Create fallback providers in order: Gemini → OpenAI → OpenRouter."""
-        fallbacks = []
-        current_provider = settings.embedding_provider.lower()
+    def _create_fallback_chain(self) -> List[Tuple[str, Callable[[], BaseEmbeddingProvider]]]:
+        """Create fallback provider factories in order: Gemini → OpenAI → OpenRouter."""
+        current_provider = _PROVIDER
         
         # Define fallback order
         provider_order = ["gemini", "openai", "openrouter"]
@@ -151,62 +340,105 @@ class EmbeddingService:
         # Remove current provider from fallback chain
         fallback_order = [p for p in provider_order if p != current_provider]
         
-        # Create fallback providers
+        fallbacks = []
         for provider_name in fallback_order:
-            try:
-                if provider_name == "gemini" and settings.google_api_key:
-                    fallbacks.append(GeminiEmbeddingProvider(
-                        api_key=settings.google_api_key,
-                        model=settings.gemini_embedding_model
-                    ))
-                elif provider_name == "openai" and settings.openai_api_key:
-                    fallbacks.append(OpenAIEmbeddingProvider(
-                        api_key=settings.openai_api_key,
-                        model=settings.openai_embedding_model
-                    ))
-                elif provider_name == "openrouter" and settings.openrouter_api_key:
-                    fallbacks.append(OpenRouterEmbeddingProvider(
-                        api_key=settings.openrouter_api_key,
-                        model=settings.openrouter_embedding_model
-                    ))
-            except Exception as e:
-                logger.warning(f"Could not create fallback provider {provider_name}: {e}")
+            factory = self._provider_factory(provider_name)
+            if factory is not None:
+                fallbacks.append((provider_name, factory))
         
         return fallbacks
 
-    def generate_embedding(self, text: str) -> List[float]:
+    def _iter_fallback_providers(self) -> Iterator[BaseEmbeddingProvider]:
+        """Yield fallback providers, instantiating each one on first use."""
+        for provider_name, factory in self._fallback_factories:
+            with self._fallback_lock:
+                provider = self._fallback_instances.get(provider_name)
+                if provider is None:
+                    try:
+                        provider = factory()
+                    except Exception as e:
+                        logger.warning(f"Could not create fallback provider {provider_name}: {e}")
+                        continue
+                    self._fallback_instances[provider_name] = provider
+            yield provider
+
+    @staticmethod
+    def _mark_failed(provider: BaseEmbeddingProvider) -> None:
+        """Open the provider's circuit so it is skipped until the half-open probe."""
+        provider._open_until = time.monotonic() + _CIRCUIT_OPEN_SECONDS
+
+    def _iter_available_fallbacks(
+        self, failed_provider: BaseEmbeddingProvider
+    ) -> Iterator[BaseEmbeddingProvider]:
+        """Yield fallback providers whose circuit is closed or half-open."""
+        now = time.monotonic()
+        for provider in self._iter_fallback_providers():
+            if provider is failed_provider:
+                continue
+            if provider._open_until > now:
+                logger.debug("Skipping %s (circuit open)", provider.__class__.__name__)
+                continue
+            yield provider
+
+    def _create_query_cache(self) -> Optional[QueryEmbeddingCache]:
+        """Create the query embedding cache if enabled."""
+        if not settings.query_cache_enabled:
+            return None
+
+        try:
+            return QueryEmbeddingCache(
+                db_path=str(Path(settings.chroma_persist_directory) / "query_cache.sqlite3"),
+                # Changing the model or its dimension must not serve the old vectors
+                namespace=(
+                    f"{settings.chroma_collection_name}:{_PROVIDER}:"
+                    f"{self.provider.model}:{self.provider.get_dimension()}"
+                ),
+                max_size=settings.query_cache_size,
+                ttl_seconds=settings.query_cache_ttl_seconds,
+                quantize=settings.quantize_cache,
+            )
+        except Exception as e:
+            logger.warning(f"Could not create query embedding cache: {e}")
+            return None
+
+    def generate_embedding(self, text: str) -> np.ndarray:
         """Generate embedding for a single text with automatic fallback.
 
         Args:
             text: Text to embed
 
         Returns:
-            Embedding vector as list of floats
+            Embedding vector as a float32 array
         """
         # Try primary provider
+        provider = self.provider
         try:
-            return self.provider.generate_embedding(text)
+            return provider._embed(text)
         except Exception as e:
             logger.warning(f"Primary provider failed: {e}")
+            self._mark_failed(provider)
             
             # Try fallback providers
-            for i, fallback_provider in enumerate(self.fallback_providers):
+            for i, fallback_provider in enumerate(self._iter_available_fallbacks(provider)):
                 try:
-                    logger.info(f"Trying fallback provider {i+1}: {fallback_provider.__class__.__name__}")
-                    embedding = fallback_provider.generate_embedding(text)
-                    logger.info(f"Successfully switched to {fallback_provider.__class__.__name__}")
+                    logger.info(
+                        "Trying fallback provider %d: %s", i + 1, fallback_provider.__class__.__name__
+                    )
+                    embedding = fallback_provider._embed(text)
+                    logger.info("Successfully switched to %s", fallback_provider.__class__.__name__)
                     # Update primary provider to the working one
                     self.provider = fallback_provider
                     return embedding
                 except Exception as fallback_error:
                     logger.warning(f"Fallback provider {i+1} failed: {fallback_error}")
+                    self._mark_failed(fallback_provider)
                     continue
             
             # All providers failed
             logger.error("All embedding providers failed")
             raise Exception(f"All embedding providers failed. Last error: {e}")
 
-    def generate_embeddings(self, text: str) -> List[float]:
+    def generate_embeddings(self, text: str) -> np.ndarray:
         """Alias for generate_embedding to support legacy/incorrect calls.
         
         Args:
@@ -217,34 +449,216 @@ class EmbeddingService:
         """
         return self.generate_embedding(text)
 
-    def generate_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
+    def generate_embeddings_batch(self, texts: List[str]) -> np.ndarray:
         """Generate embeddings for multiple texts.
 
+        Batches of settings.batch_size texts are sent concurrently, with at most
+        settings.embedding_concurrency requests in flight.
+
         Args:
             texts: List of texts to embed
 
         Returns:
-            List of embedding vectors
+            Float32 array of shape (len(texts), dimension)
         """
-        embeddings = []
         batch_size = settings.batch_size
+        batches = [texts[i : i + batch_size] for i in range(0, len(texts), batch_size)]
+        total_batches = len(batches)
+        max_workers = max(1, min(settings.embedding_concurrency, total_batches))
+
+        embeddings = None
+        offset = 0
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # map() yields results in submission order, keeping embeddings aligned with texts
+            for batch_embeddings in executor.map(
+                self._embed_batch, batches, range(1, total_batches + 1), repeat(total_batches)
+            ):
+                if embeddings is None:
+                    embeddings = np.empty((len(texts), batch_embeddings.shape[1]), dtype=np.float32)
+                embeddings[offset : offset + len(batch_embeddings)] = batch_embeddings
+                offset += len(batch_embeddings)
+
+        if embeddings is None:
+            return np.empty((0, self.provider.get_dimension()), dtype=np.float32)
+        return embeddings
 
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i : i + batch_size]
-            logger.info(f"Processing batch {i // batch_size + 1}/{(len(texts) + batch_size - 1) // batch_size}")
+    def embed_in_batches(
+        self, texts: Iterable[str], batch_size: Optional[int] = None
+    ) -> Iterator[np.ndarray]:
+        """Embed a stream of texts, yielding one embedding array per batch.
 
-            for text in batch:
+        Texts are pulled from the iterable only as batches are embedded, so the
+        caller can store each batch before the next one is requested.
+
+        Args:
+            texts: Texts to embed
+            batch_size: Texts per batch (defaults to settings.batch_size)
+
+        Yields:
+            Float32 array of shape (len(batch), dimension) for each batch, in order
+        """
+        batch_size = batch_size or settings.batch_size
+        iterator = iter(texts)
+        batch_number = 0
+        while batch := list(islice(iterator, batch_size)):
+            batch_number += 1
+            yield self._embed_batch(batch, batch_number)
+
+    def _embed_batch(
+        self, batch: List[str], batch_number: int, total_batches: Optional[int] = None
+    ) -> np.ndarray:
+        """Embed one batch, falling back to per-text requests if the batch request fails."""
+        if total_batches is None:
+            logger.info("Processing batch %d", batch_number)
+        else:
+            logger.info("Processing batch %d/%d", batch_number, total_batches)
+
+        try:
+            batch_embeddings = self._generate_batch_with_fallback(batch)
+            if len(batch_embeddings) != len(batch):
+                raise ValueError(
+                    f"Expected {len(batch)} embeddings, got {len(batch_embeddings)}"
+                )
+            return batch_embeddings
+        except Exception as e:
+            logger.warning(f"Batch request failed, embedding texts one by one: {e}")
+
+        embeddings = []
+        for text in batch:
+            try:
+                embedding = self.generate_embedding(text)
+                embeddings.append(embedding)
+            except Exception as e:
+                logger.error(f"Error in batch processing: {e}")
+                # Add zero vector as placeholder for failed embeddings
+                embeddings.append(np.zeros(self.provider.get_dimension(), dtype=np.float32))
+
+        return np.stack(embeddings)
+
+    def _generate_batch_with_fallback(self, texts: List[str]) -> np.ndarray:
+        """Embed a whole batch in one provider request, trying fallbacks on failure.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            Embedding vectors in the same order as texts
+        """
+        provider = self.provider
+        try:
+            return self._with_rate_limit_retry(provider.generate_embeddings_batch, texts)
+        except Exception as e:
+            logger.warning(f"Primary provider failed on batch: {e}")
+            self._mark_failed(provider)
+
+            for fallback_provider in self._iter_available_fallbacks(provider):
                 try:
-                    embedding = self.generate_embedding(text)
-                    embeddings.append(embedding)
-                except Exception as e:
-                    logger.error(f"Error in batch processing: {e}")
-                    # Add zero vector as placeholder for failed embeddings
-                    embeddings.append([0.0] * self.provider.get_dimension())
+                    embeddings = self._with_rate_limit_retry(
+                        fallback_provider.generate_embeddings_batch, texts
+                    )
+                    logger.info("Successfully switched to %s", fallback_provider.__class__.__name__)
+                    self.provider = fallback_provider
+                    return embeddings
+                except Exception as fallback_error:
+                    logger.warning(f"Fallback provider failed on batch: {fallback_error}")
+                    self._mark_failed(fallback_provider)
 
-        return embeddings
+            raise
+
+    async def agenerate_embeddings_batch(self, texts: List[str]) -> np.ndarray:
+        """Async variant of generate_embeddings_batch for very large jobs.
+
+        All batches are submitted at once on a single event loop and share one
+        keep-alive HTTP client, which is reused by later calls on the same loop
+        until aclose() is called, with at most settings.embedding_concurrency
+        requests in flight. A batch whose request fails is re-run through the
+        blocking path, which handles fallback providers and per-text retries.
+
+        Args:
+            texts: List of texts to embed
+
+        Returns:
+            Float32 array of shape (len(texts), dimension)
+        """
+        batch_size = settings.batch_size
+        batches = [texts[i : i + batch_size] for i in range(0, len(texts), batch_size)]
+        if not batches:
+            return np.empty((0, self.provider.get_dimension()), dtype=np.float32)
 
-    def generate_query_embedding(self, query: str) -> List[float]:
+        total_batches = len(batches)
+        semaphore = asyncio.Semaphore(settings.embedding_concurrency)
+        client = self._get_async_client()
+        results = await asyncio.gather(
+            *(
+                self._aembed_batch(client, semaphore, batch, batch_number, total_batches)
+                for batch_number, batch in enumerate(batches, start=1)
+            )
+        )
+        return np.concatenate(results)
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """Get the async HTTP client of the running event loop, creating it if needed."""
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_client_loop is not loop:
+            self._async_client = _create_async_http_client()
+            self._async_client_loop = loop
+        return self._async_client
+
+    async def aclose(self) -> None:
+        """Close the async HTTP client and its keep-alive connections."""
+        client, self._async_client, self._async_client_loop = self._async_client, None, None
+        if client is not None:
+            await client.aclose()
+
+    async def _aembed_batch(
+        self,
+        client: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+        batch: List[str],
+        batch_number: int,
+        total_batches: int,
+    ) -> np.ndarray:
+        """Embed one batch over the shared async client."""
+        async with semaphore:
+            logger.info("Processing batch %d/%d", batch_number, total_batches)
+            provider = self.provider
+            try:
+                for attempt in range(settings.embedding_max_retries + 1):
+                    try:
+                        batch_embeddings = await provider.agenerate_embeddings_batch(client, batch)
+                        break
+                    except Exception as e:
+                        if attempt == settings.embedding_max_retries or not _is_rate_limit_error(e):
+                            raise
+                        delay = 2 ** attempt + random.uniform(0, 1)
+                        logger.warning(f"Rate limited, retrying in {delay:.1f}s: {e}")
+                        await asyncio.sleep(delay)
+                if len(batch_embeddings) != len(batch):
+                    raise ValueError(
+                        f"Expected {len(batch)} embeddings, got {len(batch_embeddings)}"
+                    )
+                return batch_embeddings
+            except Exception as e:
+                logger.warning(f"Async batch request failed, using blocking fallback path: {e}")
+
+        return await asyncio.to_thread(self._embed_batch, batch, batch_number, total_batches)
+
+    @staticmethod
+    def _with_rate_limit_retry(
+        func: Callable[[List[str]], np.ndarray], texts: List[str]
+    ) -> np.ndarray:
+        """Call a provider, retrying with exponential backoff while it is rate limited."""
+        for attempt in range(settings.embedding_max_retries + 1):
+            try:
+                return func(texts)
+            except Exception as e:
+                if attempt == settings.embedding_max_retries or not _is_rate_limit_error(e):
+                    raise
+                delay = 2 ** attempt + random.uniform(0, 1)
+                logger.warning(f"Rate limited, retrying in {delay:.1f}s: {e}")
+                time.sleep(delay)
+
+    def generate_query_embedding(self, query: str) -> np.ndarray:
         """Generate embedding for a search query.
 
         Args:
@@ -253,10 +667,107 @@ class EmbeddingService:
         Returns:
             Embedding vector
         """
-        # For OpenAI and OpenRouter, same method works for queries
-        # For Gemini, we could use task_type="retrieval_query" but keeping it simple
-        return self.generate_embedding(query)
+        if self.query_cache is None:
+            return self.generate_embedding(query)
+
+        normalized_query = QueryEmbeddingCache.normalize(query)
+        embedding = self.query_cache.get(normalized_query)
+        if embedding is None:
+            # For OpenAI and OpenRouter, same method works for queries
+            # For Gemini, we could use task_type="retrieval_query" but keeping it simple
+            # The normalized text is only the cache key; the query is embedded as given
+            provider = self.provider
+            embedding = self.generate_embedding(query)
+            if self._is_cache_provider(provider):
+                self.query_cache.put(normalized_query, embedding)
+        return embedding
+
+    async def agenerate_query_embedding(self, query: str) -> np.ndarray:
+        """Async variant of generate_query_embedding that batches concurrent queries.
+
+        Queries missing from the cache are collected for up to
+        settings.query_batch_delay seconds, or until settings.query_batch_size
+        are waiting, and embedded with one batch request in a worker thread.
+        Pending queries are tied to one event loop at a time.
+
+        Args:
+            query: Search query text
+
+        Returns:
+            Embedding vector
+        """
+        if self.query_cache is None:
+            return await self._aembed_query(query)
+
+        normalized_query = QueryEmbeddingCache.normalize(query)
+        embedding = self.query_cache.get(normalized_query)
+        if embedding is None:
+            provider = self.provider
+            embedding = await self._aembed_query(query)
+            if self._is_cache_provider(provider):
+                self.query_cache.put(normalized_query, embedding)
+        return embedding
+
+    def _is_cache_provider(self, provider: BaseEmbeddingProvider) -> bool:
+        """Check that an embedding requested from provider was not produced by a fallback."""
+        return provider is self._cache_provider and self.provider is provider
+
+    async def _aembed_query(self, text: str) -> np.ndarray:
+        """Queue a query text for the next batch and wait for its embedding."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending_queries.append((text, future))
+        if len(self._pending_queries) >= settings.query_batch_size:
+            self._flush_query_batch()
+        elif self._query_flush_handle is None:
+            self._query_flush_handle = loop.call_later(
+                settings.query_batch_delay, self._flush_query_batch
+            )
+        return await future
+
+    def _flush_query_batch(self) -> None:
+        """Start embedding all pending query texts as one batch."""
+        if self._query_flush_handle is not None:
+            self._query_flush_handle.cancel()
+            self._query_flush_handle = None
+        batch, self._pending_queries = self._pending_queries, []
+        if batch:
+            task = asyncio.ensure_future(self._aembed_query_batch(batch))
+            # The event loop only keeps weak references to tasks
+            self._query_batch_tasks.add(task)
+            task.add_done_callback(self._query_batch_tasks.discard)
+
+    async def _aembed_query_batch(
+        self, batch: List[Tuple[str, "asyncio.Future[np.ndarray]"]]
+    ) -> None:
+        """Embed a batch of query texts and resolve the futures waiting for them."""
+        texts = [text for text, _ in batch]
+        try:
+            embeddings = await asyncio.to_thread(self._generate_batch_with_fallback, texts)
+            if len(embeddings) != len(texts):
+                raise ValueError(f"Expected {len(texts)} embeddings, got {len(embeddings)}")
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), embedding in zip(batch, embeddings):
+            if not future.done():
+                future.set_result(embedding)
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get query embedding cache statistics."""
+        if self.query_cache is None:
+            return {}
+        return self.query_cache.get_stats()
     
     def get_embedding_dimension(self) -> int:
         """Get the dimension of embeddings from current provider."""
         return self.provider.get_dimension()
+
+
+@lru_cache(maxsize=1)
+def get_embedding_service() -> EmbeddingService:
+    """Get the process-wide EmbeddingService instance."""
+    return EmbeddingService()
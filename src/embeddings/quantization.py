@@ -0,0 +1,37 @@
+"""Scalar quantization helpers for embedding storage."""
+
+from typing import Tuple
+
+import numpy as np
+
+
+def quantize_int8(vector: np.ndarray) -> Tuple[np.ndarray, float]:
+    """Quantize a vector to int8 with a symmetric per-vector scale.
+
+    Args:
+        vector: Float embedding vector
+
+    Returns:
+        (int8 vector, scale) such that vector ≈ int8_vector * scale
+    """
+    vector = np.asarray(vector, dtype=np.float32)
+    max_abs = float(np.max(np.abs(vector))) if vector.size else 0.0
+    if max_abs == 0.0:
+        return np.zeros(vector.shape, dtype=np.int8), 0.0
+
+    scale = max_abs / 127.0
+    quantized = np.clip(np.rint(vector / scale), -127, 127).astype(np.int8)
+    return quantized, scale
+
+
+def dequantize_int8(quantized: np.ndarray, scale: float) -> np.ndarray:
+    """Restore a float32 vector from its int8 representation.
+
+    Args:
+        quantized: int8 vector
+        scale: Scale returned by quantize_int8
+
+    Returns:
+        Approximate float32 vector
+    """
+    return quantized.astype(np.float32) * np.float32(scale)
@@ -0,0 +1,199 @@
+"""Persistent cache for query embeddings."""
+
+import sqlite3
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Dict, Any
+
+import numpy as np
+
+from src.embeddings.quantization import quantize_int8, dequantize_int8
+from src.utils.logger import setup_logger
+
+logger = setup_logger("embeddings.query_cache")
+
+# Hit/miss counts are persisted with the next write, or after this many lookups
+_STATS_FLUSH_INTERVAL = 64
+
+
+class QueryEmbeddingCache:
+    """Two-tier cache (in-memory LRU + SQLite) for query embeddings.
+
+    Queries are normalized before lookup so that trivially different spellings
+    of the same search ("Error  handling", "error handling") share one entry.
+    Persisted embeddings can be stored as int8 with a per-vector scale, which
+    cuts the on-disk size 4x; the in-memory tier always holds float32.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        namespace: str,
+        max_size: int = 1024,
+        ttl_seconds: int = 0,
+        quantize: bool = False,
+    ):
+        """Initialize the cache.
+
+        Args:
+            db_path: Path to the SQLite database file
+            namespace: Namespace separating entries of different collections/providers
+            max_size: Maximum number of entries kept in memory
+            ttl_seconds: Time-to-live of persisted entries (0 disables expiry)
+            quantize: Persist embeddings as int8 instead of float32
+        """
+        self.namespace = namespace
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.quantize = quantize
+        self.hits = 0
+        self.misses = 0
+        self._unsaved_hits = 0
+        self._unsaved_misses = 0
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS query_embeddings (
+                namespace TEXT NOT NULL,
+                query TEXT NOT NULL,
+                embedding BLOB NOT NULL,
+                scale REAL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (namespace, query)
+            );
+            CREATE TABLE IF NOT EXISTS query_cache_stats (
+                namespace TEXT PRIMARY KEY,
+                hits INTEGER NOT NULL DEFAULT 0,
+                misses INTEGER NOT NULL DEFAULT 0
+            );
+            """
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(query_embeddings)")}
+        if "scale" not in columns:
+            self._conn.execute("ALTER TABLE query_embeddings ADD COLUMN scale REAL")
+        self._conn.commit()
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Normalize a query for cache lookup."""
+        return " ".join(query.lower().split())
+
+    def get(self, query: str) -> Optional[np.ndarray]:
+        """Look up the embedding for a normalized query.
+
+        Args:
+            query: Normalized query text
+
+        Returns:
+            Cached embedding, or None on a miss
+        """
+        embedding = self._memory.get(query)
+        if embedding is not None:
+            self._memory.move_to_end(query)
+            self._record(hit=True)
+            return embedding
+
+        row = self._conn.execute(
+            "SELECT embedding, scale, created_at FROM query_embeddings "
+            "WHERE namespace = ? AND query = ?",
+            (self.namespace, query),
+        ).fetchone()
+        if row and not self._is_expired(row[2]):
+            blob, scale = row[0], row[1]
+            if scale is None:
+                embedding = np.frombuffer(blob, dtype=np.float32)
+            else:
+                embedding = dequantize_int8(np.frombuffer(blob, dtype=np.int8), scale)
+            self._remember(query, embedding)
+            self._record(hit=True)
+            return embedding
+
+        self._record(hit=False)
+        return None
+
+    def put(self, query: str, embedding: np.ndarray) -> None:
+        """Store the embedding for a normalized query.
+
+        Args:
+            query: Normalized query text
+            embedding: Embedding vector
+        """
+        self._remember(query, embedding)
+        if self.quantize:
+            quantized, scale = quantize_int8(embedding)
+            blob = quantized.tobytes()
+        else:
+            blob, scale = np.asarray(embedding, dtype=np.float32).tobytes(), None
+        self._conn.execute(
+            "INSERT OR REPLACE INTO query_embeddings "
+            "(namespace, query, embedding, scale, created_at) VALUES (?, ?, ?, ?, ?)",
+            (self.namespace, query, blob, scale, time.time()),
+        )
+        self._save_stats()
+        self._conn.commit()
+
+    def clear(self) -> None:
+        """Drop all cached entries of this namespace."""
+        self._memory.clear()
+        self._conn.execute("DELETE FROM query_embeddings WHERE namespace = ?", (self.namespace,))
+        self._conn.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cumulative hit/miss counters for this namespace.
+
+        Returns:
+            Dictionary with statistics
+        """
+        self._save_stats()
+        self._conn.commit()
+        row = self._conn.execute(
+            "SELECT hits, misses FROM query_cache_stats WHERE namespace = ?",
+            (self.namespace,),
+        ).fetchone()
+        hits, misses = row if row else (0, 0)
+        return {"cache_hits": hits, "cache_misses": misses}
+
+    def _remember(self, query: str, embedding: np.ndarray) -> None:
+        """Insert into the in-memory LRU, evicting the oldest entry if full."""
+        self._memory[query] = embedding
+        self._memory.move_to_end(query)
+        if len(self._memory) > self.max_size:
+            self._memory.popitem(last=False)
+
+    def _is_expired(self, created_at: float) -> bool:
+        return self.ttl_seconds > 0 and time.time() - created_at > self.ttl_seconds
+
+    def _record(self, hit: bool) -> None:
+        """Update in-process hit/miss counters, persisting them every few lookups.
+
+        Memory-tier hits then stay off SQLite, whose commit costs far more than
+        the lookup itself.
+        """
+        if hit:
+            self.hits += 1
+            self._unsaved_hits += 1
+        else:
+            self.misses += 1
+            self._unsaved_misses += 1
+        if self._unsaved_hits + self._unsaved_misses >= _STATS_FLUSH_INTERVAL:
+            self._save_stats()
+            self._conn.commit()
+
+    def _save_stats(self) -> None:
+        """Add the counts recorded since the last save to the persisted counters."""
+        if not self._unsaved_hits and not self._unsaved_misses:
+            return
+        self._conn.execute(
+            "INSERT OR IGNORE INTO query_cache_stats (namespace) VALUES (?)", (self.namespace,)
+        )
+        self._conn.execute(
+            "UPDATE query_cache_stats SET hits = hits + ?, misses = misses + ? "
+            "WHERE namespace = ?",
+            (self._unsaved_hits, self._unsaved_misses, self.namespace),
+        )
+        self._unsaved_hits = 0
+        self._unsaved_misses = 0
@@ -1,15 +1,61 @@
 """Vector store using ChromaDB."""
 
-from typing import List, Dict, Any, Optional
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple, Union
+import numpy as np
+import orjson
 import chromadb
 from chromadb.config import Settings as ChromaSettings
 
-from src.models.code_unit import CodeUnit
+from src.models.code_unit import CodeUnit, CodeUnitBatch
+from src.parser.base_parser import decode_source, open_source
 from src.config import settings
 from src.utils.logger import setup_logger
 
 logger = setup_logger("embeddings.vector_store")
 
+# File path prefix of code indexed from memory; such units cannot be re-read from disk
+SNIPPET_PATH_PREFIX = "<snippet:"
+
+# Formatted query results shared by all VectorStore instances of the process, so
+# that a write through the indexer's store invalidates the search engine's cache
+_search_cache: "OrderedDict[Tuple[bytes, int, bytes], List[Dict[str, Any]]]" = OrderedDict()
+_search_cache_lock = threading.Lock()
+
+
+def _invalidate_search_cache() -> None:
+    """Drop all cached query results after the collection changed."""
+    with _search_cache_lock:
+        _search_cache.clear()
+
+
+def _rebuild_document(metadata: Dict[str, Any]) -> str:
+    """Rebuild a unit's searchable text from its source file when documents are not stored.
+
+    The file is read afresh, so that a file re-indexed after an edit is not
+    sliced with the new line ranges from stale cached lines.
+    """
+    file_path = metadata["file_path"]
+    try:
+        with open_source(file_path) as data:
+            lines = decode_source(data, file_path).split("\n")
+    except OSError as e:
+        logger.warning(f"Could not re-read {file_path}: {e}")
+        lines = []
+    content = "\n".join(lines[metadata["start_line"] - 1 : metadata["end_line"]])
+    return CodeUnit(
+        type=metadata["type"],
+        name=metadata["name"],
+        content=content,
+        file_path=metadata["file_path"],
+        start_line=metadata["start_line"],
+        end_line=metadata["end_line"],
+        language=metadata["language"],
+        signature=metadata.get("signature") or None,
+        docstring=metadata.get("docstring") or None,
+    ).to_searchable_text()
+
 
 class VectorStore:
     """ChromaDB-based vector store for code embeddings."""
@@ -23,65 +69,85 @@ class VectorStore:
         self.collection = self.client.get_or_create_collection(
             name=settings.chroma_collection_name,
             metadata={"description": "Code embeddings for semantic search"},
+            configuration={
+                "hnsw": {
+                    "space": "l2",
+                    "max_neighbors": settings.hnsw_max_neighbors,
+                    "ef_construction": settings.hnsw_ef_construction,
+                    "ef_search": settings.hnsw_ef_search,
+                }
+            },
         )
+        # Only ef_search can change once the index exists
+        hnsw_config = (self.collection.configuration or {}).get("hnsw") or {}
+        if hnsw_config.get("ef_search") != settings.hnsw_ef_search:
+            self.collection.modify(configuration={"hnsw": {"ef_search": settings.hnsw_ef_search}})
         logger.info(f"Initialized ChromaDB collection: {settings.chroma_collection_name}")
 
     def add_code_units(
-        self, code_units: List[CodeUnit], embeddings: List[List[float]]
+        self,
+        code_units: Union[List[CodeUnit], CodeUnitBatch],
+        embeddings: np.ndarray,
+        documents: Optional[List[str]] = None,
+        batch_size: int = 500,
     ) -> None:
         """Add code units with their embeddings to the vector store.
 
+        Units are written in slices of batch_size so that only one batch of
+        ids/documents/metadatas is materialized at a time.
+
         Args:
-            code_units: List of code units
-            embeddings: Corresponding embedding vectors
+            code_units: Code units, as a list or an already columnar batch
+            embeddings: Corresponding embedding vectors, one row per code unit
+            documents: Searchable texts of listed code units, if already computed
+            batch_size: Number of code units per collection.add call
         """
+        # One contiguous float32 block; the per-batch slices below are views into it
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
         if len(code_units) != len(embeddings):
             raise ValueError("Number of code units must match number of embeddings")
+        if documents is not None and len(documents) != len(code_units):
+            raise ValueError("Number of code units must match number of documents")
+        if not isinstance(code_units, CodeUnitBatch):
+            code_units = CodeUnitBatch.from_units(code_units, documents)
 
-        # Generate unique IDs including name and type to avoid duplicates
-        ids = [
-            f"{cu.file_path}:{cu.type}:{cu.name}:{cu.start_line}-{cu.end_line}" 
-            for cu in code_units
-        ]
-        documents = [cu.to_searchable_text() for cu in code_units]
-        metadatas = [
-            {
-                "type": cu.type,
-                "name": cu.name,
-                "file_path": cu.file_path,
-                "start_line": cu.start_line,
-                "end_line": cu.end_line,
-                "language": cu.language,
-                "signature": cu.signature or "",
-                "docstring": cu.docstring or "",
-                # Convert concepts list to comma-separated string
-                "concepts": cu.metadata.get("concepts", "") if cu.metadata else "",
-                # Rich metadata
-                "imports": cu.metadata.get("imports", "") if cu.metadata else "",
-                "complexity": cu.metadata.get("complexity", 0) if cu.metadata else 0,
-                "has_docs": cu.metadata.get("has_docs", False) if cu.metadata else False,
-                "param_count": cu.metadata.get("param_count", 0) if cu.metadata else 0,
-            }
-            for cu in code_units
-        ]
-
-        self.collection.add(
-            ids=ids,
-            embeddings=embeddings,
-            documents=documents,
-            metadatas=metadatas,
-        )
+        # Stay under ChromaDB's own per-call limit
+        batch_size = max(1, min(batch_size, self.client.get_max_batch_size()))
+        total_batches = (len(code_units) + batch_size - 1) // batch_size
 
+        for batch_number, start in enumerate(range(0, len(code_units), batch_size), start=1):
+            stop = start + batch_size
+            ids, batch_documents, metadatas = code_units.to_chroma_payload(start, stop)
+            if not settings.store_documents:
+                # Snippets have no source file to rebuild their documents from
+                batch_documents = [
+                    document if metadata["file_path"].startswith(SNIPPET_PATH_PREFIX) else None
+                    for document, metadata in zip(batch_documents, metadatas)
+                ]
+                if not any(batch_documents):
+                    batch_documents = None
+            self.collection.add(
+                ids=ids,
+                embeddings=embeddings[start:stop],
+                documents=batch_documents,
+                metadatas=metadatas,
+            )
+            logger.debug("Stored batch %d/%d", batch_number, total_batches)
+
+        _invalidate_search_cache()
         logger.info(f"Added {len(code_units)} code units to vector store")
 
     def search(
         self,
-        query_embedding: List[float],
+        query_embedding: np.ndarray,
         limit: int = 10,
         filter_dict: Optional[Dict[str, Any]] = None,
     ) -> List[Dict[str, Any]]:
         """Search for similar code units.
 
+        Results are memoized per (embedding, limit, filters) until the next write
+        to the collection from this process.
+
         Args:
             query_embedding: Query embedding vector
             limit: Maximum number of results
@@ -90,6 +156,22 @@ class VectorStore:
         Returns:
             List of search results with metadata
         """
+        cache_key = None
+        if settings.search_cache_size > 0:
+            cache_key = (
+                np.asarray(query_embedding, dtype=np.float32).tobytes(),
+                limit,
+                orjson.dumps(filter_dict, option=orjson.OPT_SORT_KEYS),
+            )
+            with _search_cache_lock:
+                cached = _search_cache.get(cache_key)
+                if cached is not None:
+                    _search_cache.move_to_end(cache_key)
+            if cached is not None:
+                logger.info("Found %d results (cached)", len(cached))
+                # Callers annotate result dicts in place, so hand out copies
+                return [dict(result) for result in cached]
+
         results = self.collection.query(
             query_embeddings=[query_embedding],
             n_results=limit,
@@ -100,18 +182,57 @@ class VectorStore:
         formatted_results = []
         if results["ids"] and results["ids"][0]:
             for i in range(len(results["ids"][0])):
+                metadata = results["metadatas"][0][i]
+                document = results["documents"][0][i]
+                if document is None:
+                    document = _rebuild_document(metadata)
                 formatted_results.append(
                     {
                         "id": results["ids"][0][i],
-                        "document": results["documents"][0][i],
-                        "metadata": results["metadatas"][0][i],
+                        "document": document,
+                        "metadata": metadata,
                         "distance": results["distances"][0][i] if "distances" in results else None,
                     }
                 )
 
-        logger.info(f"Found {len(formatted_results)} results")
+        if cache_key is not None:
+            with _search_cache_lock:
+                _search_cache[cache_key] = [dict(result) for result in formatted_results]
+                if len(_search_cache) > settings.search_cache_size:
+                    _search_cache.popitem(last=False)
+
+        logger.info("Found %d results", len(formatted_results))
         return formatted_results
 
+    def get_by_metadata(self, file_path: str, name: str) -> Optional[Dict[str, Any]]:
+        """Get a code unit by its file path and name, without a similarity query.
+
+        Args:
+            file_path: Path to the file containing the code unit
+            name: Name of the code unit
+
+        Returns:
+            The code unit as a search result without a distance, or None if not stored
+        """
+        results = self.collection.get(
+            where={"$and": [{"file_path": file_path}, {"name": name}]},
+            limit=1,
+            include=["documents", "metadatas"],
+        )
+        if not results["ids"]:
+            return None
+
+        metadata = results["metadatas"][0]
+        document = results["documents"][0]
+        if document is None:
+            document = _rebuild_document(metadata)
+        return {
+            "id": results["ids"][0],
+            "document": document,
+            "metadata": metadata,
+            "distance": None,
+        }
+
     def delete_by_file(self, file_path: str) -> None:
         """Delete all code units from a specific file.
 
@@ -119,15 +240,19 @@ class VectorStore:
             file_path: Path to the file
         """
         self.collection.delete(where={"file_path": file_path})
+        _invalidate_search_cache()
         logger.info(f"Deleted code units from {file_path}")
 
     def clear(self) -> None:
-        """Clear all data from the collection."""
-        self.client.delete_collection(settings.chroma_collection_name)
-        self.collection = self.client.create_collection(
-            name=settings.chroma_collection_name,
-            metadata={"description": "Code embeddings for semantic search"},
-        )
+        """Clear all data from the collection.
+
+        Entries are deleted in batches rather than dropping and recreating the
+        collection, which keeps the collection and its index configuration.
+        """
+        batch_size = self.client.get_max_batch_size()
+        while ids := self.collection.get(include=[], limit=batch_size)["ids"]:
+            self.collection.delete(ids=ids)
+        _invalidate_search_cache()
         logger.info("Cleared vector store")
 
     def get_stats(self) -> Dict[str, Any]:
@@ -1,8 +1,14 @@
 """Multi-provider generation service for LLM text generation."""
 
+import asyncio
+import importlib.util
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import List, Dict, Any, Optional
 from abc import ABC, abstractmethod
 
+import httpx
 import google.generativeai as genai
 from openai import OpenAI
 
@@ -11,6 +17,44 @@ from src.utils.logger import setup_logger
 
 logger = setup_logger("generation.service")
 
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+
+
+@lru_cache(maxsize=1)
+def _get_http_client() -> httpx.Client:
+    """Get the keep-alive HTTP client shared by all OpenAI-compatible providers.
+
+    Sharing one pool lets the primary and fallback providers reuse warm
+    TCP/TLS connections; HTTP/2 is used when the optional h2 package is installed.
+    """
+    return httpx.Client(
+        http2=importlib.util.find_spec("h2") is not None,
+        limits=httpx.Limits(max_keepalive_connections=32),
+    )
+
+
+@lru_cache(maxsize=1)
+def _get_executor() -> ThreadPoolExecutor:
+    """Get the long-lived pool running blocking provider calls.
+
+    Unlike asyncio.to_thread on a short-lived loop, nothing waits for this
+    pool to finish, so a cancelled slow call keeps running in the background
+    without delaying the answer of a faster provider.
+    """
+    return ThreadPoolExecutor(thread_name_prefix="generation")
+
+
+@lru_cache(maxsize=1)
+def _get_event_loop() -> asyncio.AbstractEventLoop:
+    """Get the background event loop that runs generation for synchronous callers.
+
+    Running the coroutine there instead of with asyncio.run also works when the
+    caller is itself inside a running event loop.
+    """
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="generation-loop", daemon=True).start()
+    return loop
+
 
 class BaseGenerationProvider(ABC):
     """Base class for generation providers."""
@@ -19,6 +63,11 @@ class BaseGenerationProvider(ABC):
     def generate_content(self, prompt: str) -> str:
         """Generate content from a prompt."""
         pass
+    
+    async def agenerate_content(self, prompt: str) -> str:
+        """Async variant of generate_content (runs the blocking call in a thread by default)."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(), self.generate_content, prompt)
 
 
 class GeminiGenerationProvider(BaseGenerationProvider):
@@ -33,13 +82,17 @@ class GeminiGenerationProvider(BaseGenerationProvider):
     def generate_content(self, prompt: str) -> str:
         response = self.model.generate_content(prompt)
         return response.text
+    
+    async def agenerate_content(self, prompt: str) -> str:
+        response = await self.model.generate_content_async(prompt)
+        return response.text
 
 
 class OpenAIGenerationProvider(BaseGenerationProvider):
     """OpenAI generation provider."""
     
     def __init__(self, api_key: str, model: str, base_url: Optional[str] = None):
-        self.client = OpenAI(api_key=api_key, base_url=base_url)
+        self.client = OpenAI(api_key=api_key, base_url=base_url, http_client=_get_http_client())
         self.model = model
         logger.info(f"Initialized OpenAI generation provider with model: {model}")
     
@@ -52,6 +105,32 @@ class OpenAIGenerationProvider(BaseGenerationProvider):
         return response.choices[0].message.content or ""
 
 
+@lru_cache(maxsize=None)
+def _get_generation_provider(provider_name: str) -> Optional[BaseGenerationProvider]:
+    """Get the process-wide provider instance, or None if its API key is not configured.
+
+    Instances are memoized so that repeated GenerationService construction and
+    fallback chains share one provider (and connection pool) per backend.
+    """
+    if provider_name == "gemini" and settings.google_api_key:
+        return GeminiGenerationProvider(
+            api_key=settings.google_api_key,
+            model=settings.gemini_generation_model
+        )
+    elif provider_name == "openai" and settings.openai_api_key:
+        return OpenAIGenerationProvider(
+            api_key=settings.openai_api_key,
+            model=settings.openai_generation_model
+        )
+    elif provider_name == "openrouter" and settings.openrouter_api_key:
+        return OpenAIGenerationProvider(
+            api_key=settings.openrouter_api_key,
+            model=settings.openrouter_generation_model,
+            base_url=OPENROUTER_BASE_URL
+        )
+    return None
+
+
 class GenerationService:
     """Service for generating content using multiple providers with fallback."""
 
@@ -67,34 +146,15 @@ class GenerationService:
         # but using the generation model config
         provider_name = settings.embedding_provider.lower()
         
-        if provider_name == "gemini":
-            if not settings.google_api_key:
-                raise ValueError("Google API key not configured")
-            return GeminiGenerationProvider(
-                api_key=settings.google_api_key,
-                model=settings.gemini_generation_model
-            )
-        
-        elif provider_name == "openai":
-            if not settings.openai_api_key:
-                raise ValueError("OpenAI API key not configured")
-            return OpenAIGenerationProvider(
-                api_key=settings.openai_api_key,
-                model=settings.openai_generation_model
-            )
-        
-        elif provider_name == "openrouter":
-            if not settings.openrouter_api_key:
-                raise ValueError("OpenRouter API key not configured")
-            return OpenAIGenerationProvider(
-                api_key=settings.openrouter_api_key,
-                model=settings.openrouter_generation_model,
-                base_url="https://openrouter.ai/api/v1"
-            )
-        
-        else:
+        if provider_name not in ("gemini", "openai", "openrouter"):
             raise ValueError(f"Unknown provider: {provider_name}")
 
+        provider = _get_generation_provider(provider_name)
+        if provider is None:
+            key_names = {"gemini": "Google", "openai": "OpenAI", "openrouter": "OpenRouter"}
+            raise ValueError(f"{key_names[provider_name]} API key not configured")
+        return provider
+
     def _create_fallback_chain(self) -> List[BaseGenerationProvider]:
         """Create fallback providers."""
         fallbacks = []
@@ -104,22 +164,9 @@ class GenerationService:
         
         for provider_name in fallback_order:
             try:
-                if provider_name == "gemini" and settings.google_api_key:
-                    fallbacks.append(GeminiGenerationProvider(
-                        api_key=settings.google_api_key,
-                        model=settings.gemini_generation_model
-                    ))
-                elif provider_name == "openai" and settings.openai_api_key:
-                    fallbacks.append(OpenAIGenerationProvider(
-                        api_key=settings.openai_api_key,
-                        model=settings.openai_generation_model
-                    ))
-                elif provider_name == "openrouter" and settings.openrouter_api_key:
-                    fallbacks.append(OpenAIGenerationProvider(
-                        api_key=settings.openrouter_api_key,
-                        model=settings.openrouter_generation_model,
-                        base_url="https://openrouter.ai/api/v1"
-                    ))
+                provider = _get_generation_provider(provider_name)
+                if provider is not None:
+                    fallbacks.append(provider)
             except Exception as e:
                 logger.warning(f"Could not create fallback generation provider {provider_name}: {e}")
         
@@ -159,16 +206,62 @@ Do not just list the files. Synthesize the information.
 
     def _generate_with_fallback(self, prompt: str) -> str:
         """Generate content handling fallbacks."""
+        return asyncio.run_coroutine_threadsafe(
+            self._agenerate_with_fallback(prompt), _get_event_loop()
+        ).result()
+
+    async def _agenerate_with_fallback(self, prompt: str) -> str:
+        """Generate content, hedging slow or failing providers with the fallbacks.
+
+        The primary provider starts immediately. Whenever no attempt has
+        finished within settings.generation_hedge_delay, or an attempt fails,
+        the next fallback is started as well; the first successful answer wins
+        and the remaining attempts are cancelled.
+        """
+        providers = [self.provider] + [p for p in self.fallback_providers if p is not self.provider]
+        attempts: Dict["asyncio.Future[str]", BaseGenerationProvider] = {}
+        pending = set()
+        next_index = 0
+
+        def start_next() -> None:
+            nonlocal next_index
+            provider = providers[next_index]
+            next_index += 1
+            attempt = asyncio.ensure_future(provider.agenerate_content(prompt))
+            attempts[attempt] = provider
+            pending.add(attempt)
+
+        start_next()
         try:
-            return self.provider.generate_content(prompt)
-        except Exception as e:
-            logger.warning(f"Generation failed with primary provider: {e}")
-            for provider in self.fallback_providers:
-                try:
-                    res = provider.generate_content(prompt)
+            while pending:
+                has_next = next_index < len(providers)
+                hedge_delay = settings.generation_hedge_delay if has_next else None
+                done, pending = await asyncio.wait(
+                    pending, timeout=hedge_delay, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    hedge_provider = providers[next_index].__class__.__name__
+                    logger.info("Generation is slow, also trying %s", hedge_provider)
+                    start_next()
+                    continue
+
+                for attempt in done:
+                    provider = attempts[attempt]
+                    try:
+                        res = attempt.result()
+                    except Exception as ex:
+                        if provider is self.provider:
+                            logger.warning(f"Generation failed with primary provider: {ex}")
+                        else:
+                            logger.warning(f"Fallback generation failed: {ex}")
+                        continue
                     self.provider = provider # Switch to working provider
                     return res
-                except Exception as ex:
-                    logger.warning(f"Fallback generation failed: {ex}")
-            
-            return "Error: Could not generate summary due to provider failures."
+
+                if next_index < len(providers):
+                    start_next()
+        finally:
+            for attempt in pending:
+                attempt.cancel()
+
+        return "Error: Could not generate summary due to provider failures."
@@ -1,43 +1,95 @@
 """Code indexer for processing codebases."""
 
+import asyncio
+import hashlib
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Iterator, Tuple, Callable
+
+import numpy as np
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
 
+from src.parser.base_parser import BaseParser
 from src.parser.python_parser import PythonParser
 from src.parser.javascript_parser import JavaScriptParser
 from src.parser.java_parser import JavaParser
 from src.parser.go_parser import GoParser
-from src.embeddings.embedding_service import EmbeddingService
-from src.embeddings.vector_store import VectorStore
-from src.models.code_unit import CodeUnit
+from src.embeddings.embedding_service import get_embedding_service
+from src.embeddings.vector_store import SNIPPET_PATH_PREFIX, VectorStore
+from src.indexer.indexed_files import IndexedFiles, Fingerprint
+from src.indexer.parse_cache import parse_file_cached
+from src.models.code_unit import CodeUnit, CodeUnitBatch
 from src.config import settings
 from src.utils.logger import setup_logger
 
 logger = setup_logger("indexer")
 
+# Directories that never contain project sources worth indexing
+SKIP_DIRS = frozenset({"__pycache__", "venv", ".venv", "node_modules", ".git"})
+
+# Number of chunks buffered between consecutive indexing pipeline stages
+_PIPELINE_DEPTH = 4
+
+
+# Extension → parser map of a parsing worker process, set once by _init_parse_worker
+_worker_extension_map: Dict[str, BaseParser] = {}
+
+
+def _init_parse_worker(extension_map: Dict[str, BaseParser]) -> None:
+    """Install the parsers in a worker process so tasks only carry file paths."""
+    global _worker_extension_map
+    _worker_extension_map = extension_map
+
+
+def _parse_file(file_path: str) -> List[CodeUnit]:
+    """Parse one file in a worker process."""
+    return parse_file_cached(_worker_extension_map[Path(file_path).suffix], file_path)
+
+
+@lru_cache(maxsize=1)
+def _get_parsers() -> Tuple[Dict[str, BaseParser], Dict[str, BaseParser]]:
+    """Create the process-wide parsers.
+
+    Returns:
+        (language → parser, file extension → parser)
+    """
+    parsers = {
+        'python': PythonParser(),
+        'javascript': JavaScriptParser(),
+        'java': JavaParser(),
+        'go': GoParser(),
+    }
+
+    # Build extension to parser mapping
+    extension_map = {}
+    for parser in parsers.values():
+        for ext in parser.get_supported_extensions():
+            extension_map[ext] = parser
+
+    return parsers, extension_map
+
 
 class CodeIndexer:
     """Main indexer for processing and indexing codebases."""
 
     def __init__(self):
         """Initialize the code indexer."""
-        # Initialize all parsers
-        self.parsers = {
-            'python': PythonParser(),
-            'javascript': JavaScriptParser(),
-            'java': JavaParser(),
-            'go': GoParser(),
-        }
+        # Parsers are stateless, so every indexer shares one set
+        self.parsers, self.extension_map = _get_parsers()
 
-        # Build extension to parser mapping
-        self.extension_map = {}
-        for parser_name, parser in self.parsers.items():
-            for ext in parser.get_supported_extensions():
-                self.extension_map[ext] = parser
-
-        self.embedding_service = EmbeddingService()
+        self.embedding_service = get_embedding_service()
         self.vector_store = VectorStore()
+        self.indexed_files = IndexedFiles(
+            str(Path(settings.chroma_persist_directory) / "indexed_files.json"),
+            namespace=settings.chroma_collection_name,
+        )
+        if self.vector_store.collection.count() == 0:
+            # The collection was cleared or never filled, so nothing is indexed
+            self.indexed_files.clear()
         logger.info(f"Initialized CodeIndexer with support for: {', '.join(self.parsers.keys())}")
 
     def index_directory(self, directory_path: str) -> Dict[str, Any]:
@@ -49,69 +101,210 @@ class CodeIndexer:
         Returns:
             Statistics about the indexing process
         """
-        directory = Path(directory_path)
-        if not directory.exists():
-            raise ValueError(f"Directory does not exist: {directory_path}")
+        return self._index_pipeline(directory_path, self.embedding_service.generate_embeddings_batch)
 
-        # Find all supported files
-        supported_files = []
-        for ext in self.extension_map.keys():
-            supported_files.extend(list(directory.rglob(f"*{ext}")))
-
-        logger.info(f"Found {len(supported_files)} supported files in {directory_path}")
-
-        all_code_units = []
-
-        # Parse files with progress bar
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            BarColumn(),
-            TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
-        ) as progress:
-            task = progress.add_task("[cyan]Parsing files...", total=len(supported_files))
-
-            for file_path in supported_files:
-                # Skip __pycache__, venv, node_modules directories
-                path_str = str(file_path)
-                if any(skip in path_str for skip in ["__pycache__", "venv", "node_modules", ".git"]):
-                    progress.advance(task)
-                    continue
+    async def aindex_directory(self, directory_path: str) -> Dict[str, Any]:
+        """Index a directory, pipelining embedding requests on an event loop.
 
-                # Get appropriate parser based on file extension
-                file_ext = file_path.suffix
-                parser = self.extension_map.get(file_ext)
+        The parse/write pipeline runs in a worker thread while its embedding
+        requests are scheduled on the running event loop, reusing one keep-alive
+        HTTP client across all chunks of the run.
 
-                if parser:
-                    code_units = parser.parse_file(str(file_path))
-                    all_code_units.extend(code_units)
+        Args:
+            directory_path: Path to directory to index
+
+        Returns:
+            Statistics about the indexing process
+        """
+        loop = asyncio.get_running_loop()
+
+        def embed(texts: List[str]) -> np.ndarray:
+            return asyncio.run_coroutine_threadsafe(
+                self.embedding_service.agenerate_embeddings_batch(texts), loop
+            ).result()
 
-                progress.advance(task)
+        try:
+            return await asyncio.to_thread(self._index_pipeline, directory_path, embed)
+        finally:
+            await self.embedding_service.aclose()
 
-        logger.info(f"Extracted {len(all_code_units)} code units")
+    def _index_pipeline(
+        self, directory_path: str, embed: Callable[[List[str]], np.ndarray]
+    ) -> Dict[str, Any]:
+        """Parse, embed and store a directory as a three-stage pipeline.
 
-        if not all_code_units:
-            logger.warning("No code units found to index")
-            return {"total_files": len(supported_files), "total_code_units": 0}
+        A parser thread packs code units into columnar chunks, an embedder
+        thread embeds them and the calling thread writes them to the vector
+        store.
+        Bounded queues between the stages overlap parsing, embedding requests
+        and database writes while keeping only a few chunks in memory.
 
-        # Generate embeddings
-        logger.info("Generating embeddings...")
-        texts = [cu.to_searchable_text() for cu in all_code_units]
-        embeddings = self.embedding_service.generate_embeddings_batch(texts)
+        Args:
+            directory_path: Path to directory to index
+            embed: Function embedding a list of texts
+
+        Returns:
+            Statistics about the indexing process
+        """
+        directory = Path(directory_path)
+        if not directory.exists():
+            raise ValueError(f"Directory does not exist: {directory_path}")
 
-        # Store in vector database
-        logger.info("Storing in vector database...")
-        self.vector_store.add_code_units(all_code_units, embeddings)
+        # Find all supported files
+        parse_jobs = self._find_supported_files(directory)
+        total_files = len(parse_jobs)
+        logger.info(f"Found {total_files} supported files in {directory_path}")
+
+        changed_files: Dict[str, Fingerprint] = {}
+        for _, file_path in parse_jobs:
+            fingerprint = self.indexed_files.check(file_path)
+            if fingerprint is not None:
+                changed_files[file_path] = fingerprint
+        if len(changed_files) < total_files:
+            logger.info(f"Skipping {total_files - len(changed_files)} unchanged files")
+            parse_jobs = [job for job in parse_jobs if job[1] in changed_files]
+
+        # Re-parsed files replace whatever was stored for them before. This includes
+        # files missing from the manifest, whose units may have been stored under the
+        # unit ids of an earlier version
+        if self.vector_store.collection.count() > 0:
+            for file_path in changed_files:
+                self.vector_store.delete_by_file(file_path)
+
+        # Each chunk keeps every concurrent embedding request of one call busy
+        chunk_size = settings.batch_size * max(1, settings.embedding_concurrency)
+        parsed: "queue.Queue[Optional[CodeUnitBatch]]" = queue.Queue(maxsize=_PIPELINE_DEPTH)
+        embedded: "queue.Queue[Optional[Tuple[CodeUnitBatch, np.ndarray]]]" = queue.Queue(
+            maxsize=_PIPELINE_DEPTH
+        )
+        errors: List[BaseException] = []
+
+        def parse_stage() -> None:
+            try:
+                chunk = CodeUnitBatch()
+                with Progress(
+                    SpinnerColumn(),
+                    TextColumn("[progress.description]{task.description}"),
+                    BarColumn(),
+                    TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
+                ) as progress:
+                    task = progress.add_task("[cyan]Parsing files...", total=len(parse_jobs))
+                    for code_units in self._parse_files(parse_jobs):
+                        for cu in code_units:
+                            chunk.append(cu)
+                            if len(chunk) >= chunk_size:
+                                parsed.put(chunk)
+                                chunk = CodeUnitBatch()
+                        progress.advance(task)
+                        if errors:
+                            return
+                if chunk:
+                    parsed.put(chunk)
+            except BaseException as e:
+                errors.append(e)
+            finally:
+                parsed.put(None)
+
+        def embed_stage() -> None:
+            try:
+                while (chunk := parsed.get()) is not None:
+                    if errors:
+                        continue  # keep draining so the parser never blocks
+                    embedded.put((chunk, embed(chunk.documents)))
+            except BaseException as e:
+                errors.append(e)
+                while parsed.get() is not None:
+                    pass
+            finally:
+                embedded.put(None)
+
+        stages = [
+            threading.Thread(target=parse_stage, name="index-parse", daemon=True),
+            threading.Thread(target=embed_stage, name="index-embed", daemon=True),
+        ]
+        for stage in stages:
+            stage.start()
+
+        total_code_units = 0
+        try:
+            logger.info("Generating embeddings and storing in vector database...")
+            while (item := embedded.get()) is not None:
+                if errors:
+                    continue
+                chunk, embeddings = item
+                self.vector_store.add_code_units(chunk, embeddings)
+                total_code_units += len(chunk)
+        except BaseException as e:
+            errors.append(e)
+            while embedded.get() is not None:
+                pass
+        finally:
+            for stage in stages:
+                stage.join()
+
+        if errors:
+            raise errors[0]
+
+        self.indexed_files.update(changed_files)
+        logger.info(f"Extracted and stored {total_code_units} code units")
+
+        if not total_code_units:
+            logger.warning("No new or changed code units to index")
+            return {"total_files": total_files, "total_code_units": 0}
 
         stats = {
-            "total_files": len(supported_files),
-            "total_code_units": len(all_code_units),
+            "total_files": total_files,
+            "total_code_units": total_code_units,
             "directory": directory_path,
         }
 
         logger.info(f"Indexing complete: {stats}")
         return stats
 
+    def _find_supported_files(self, directory: Path) -> List[Tuple[BaseParser, str]]:
+        """Find supported files, pruning SKIP_DIRS so their contents are never listed.
+
+        Args:
+            directory: Directory to search recursively
+
+        Returns:
+            (parser, file path) pairs
+        """
+        parse_jobs = []
+        for root, dirnames, filenames in os.walk(directory):
+            dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+            for filename in filenames:
+                parser = self.extension_map.get(os.path.splitext(filename)[1])
+                if parser:
+                    parse_jobs.append((parser, os.path.join(root, filename)))
+        return parse_jobs
+
+    def _parse_files(self, parse_jobs: List[Tuple[BaseParser, str]]) -> Iterator[List[CodeUnit]]:
+        """Parse files, in worker processes when more than one worker is configured.
+
+        Args:
+            parse_jobs: (parser, file path) pairs
+
+        Yields:
+            Code units of each file, in the order of parse_jobs
+        """
+        workers = settings.parsing_workers or os.cpu_count() or 1
+        workers = min(workers, len(parse_jobs))
+
+        if workers <= 1:
+            for parser, file_path in parse_jobs:
+                yield parse_file_cached(parser, file_path)
+            return
+
+        file_paths = [file_path for _, file_path in parse_jobs]
+        chunksize = max(1, len(parse_jobs) // (workers * 4))
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_parse_worker,
+            initargs=(self.extension_map,),
+        ) as executor:
+            yield from executor.map(_parse_file, file_paths, chunksize=chunksize)
+
     def index_file(self, file_path: str) -> Dict[str, Any]:
         """Index a single code file.
 
@@ -135,16 +328,48 @@ class CodeIndexer:
         # Parse file
         code_units = parser.parse_file(file_path)
 
+        return self._index_code_units(code_units, file_path)
+
+    def index_source(
+        self, code: str, language: str, file_path: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Index source code held in memory without writing it to disk.
+
+        Args:
+            code: Source code to index
+            language: Language of the code ('python', 'javascript', 'java', 'go')
+            file_path: Path recorded on the code units (defaults to a content-derived name)
+
+        Returns:
+            Statistics about the indexing process
+        """
+        parser = self.parsers.get(language)
+        if not parser:
+            raise ValueError(
+                f"Unsupported language: {language}. Supported: {list(self.parsers.keys())}"
+            )
+
+        if file_path is None:
+            digest = hashlib.sha1(code.encode('utf-8')).hexdigest()[:12]
+            file_path = f"{SNIPPET_PATH_PREFIX}{digest}>"
+
+        code_units = parser.parse_source(code, file_path)
+
+        return self._index_code_units(code_units, file_path)
+
+    def _index_code_units(self, code_units: List[CodeUnit], file_path: str) -> Dict[str, Any]:
+        """Embed and store the code units parsed from one file or snippet."""
         if not code_units:
             logger.warning(f"No code units found in {file_path}")
             return {"total_code_units": 0}
 
-        # Generate embeddings
+        # Generate embeddings and store each batch as soon as it is ready
         texts = [cu.to_searchable_text() for cu in code_units]
-        embeddings = self.embedding_service.generate_embeddings_batch(texts)
-
-        # Store in vector database
-        self.vector_store.add_code_units(code_units, embeddings)
+        start = 0
+        for embeddings in self.embedding_service.embed_in_batches(texts):
+            stop = start + len(embeddings)
+            self.vector_store.add_code_units(code_units[start:stop], embeddings, texts[start:stop])
+            start = stop
 
         stats = {
             "file_path": file_path,
@@ -160,4 +385,6 @@ class CodeIndexer:
         Returns:
             Statistics dictionary
         """
-        return self.vector_store.get_stats()
+        stats = self.vector_store.get_stats()
+        stats.update(self.embedding_service.get_cache_stats())
+        return stats
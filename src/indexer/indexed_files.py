@@ -0,0 +1,88 @@
+"""Manifest of indexed files used to make re-indexing incremental."""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from src.utils.logger import setup_logger
+
+logger = setup_logger("indexer.indexed_files")
+
+# (st_mtime_ns, sha1 of content)
+Fingerprint = Tuple[int, str]
+
+
+class IndexedFiles:
+    """JSON sidecar recording the mtime and content hash of every indexed file.
+
+    A file whose mtime is unchanged is skipped without being read; a file that
+    was touched but whose content hash is unchanged is skipped as well.
+    """
+
+    def __init__(self, manifest_path: str, namespace: str):
+        """Load the manifest.
+
+        Args:
+            manifest_path: Path to the JSON manifest file
+            namespace: Namespace separating entries of different collections
+        """
+        self.manifest_path = Path(manifest_path)
+        self.namespace = namespace
+        self._manifest: Dict[str, Dict[str, List]] = {}
+        if self.manifest_path.exists():
+            try:
+                self._manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable index manifest {manifest_path}: {e}")
+        self._files = self._manifest.setdefault(namespace, {})
+
+    def check(self, file_path: str) -> Optional[Fingerprint]:
+        """Check whether a file changed since it was last indexed.
+
+        Args:
+            file_path: Path of the file
+
+        Returns:
+            New fingerprint if the file is new or changed, None if unchanged or
+            unreadable (e.g. a dangling symlink or a file deleted meanwhile)
+        """
+        try:
+            mtime_ns = os.stat(file_path).st_mtime_ns
+            entry = self._files.get(file_path)
+            if entry is not None and entry[0] == mtime_ns:
+                return None
+
+            with open(file_path, "rb") as f:
+                sha1 = hashlib.sha1(f.read()).hexdigest()
+        except OSError as e:
+            logger.warning(f"Skipping unreadable file {file_path}: {e}")
+            return None
+        if entry is not None and entry[1] == sha1:
+            # Touched but unchanged: remember the new mtime so the next check is stat-only
+            self._files[file_path] = [mtime_ns, sha1]
+            return None
+        return mtime_ns, sha1
+
+    def update(self, fingerprints: Dict[str, Fingerprint]) -> None:
+        """Record freshly indexed files and persist the manifest.
+
+        Args:
+            fingerprints: Fingerprints returned by check(), keyed by file path
+        """
+        for file_path, (mtime_ns, sha1) in fingerprints.items():
+            self._files[file_path] = [mtime_ns, sha1]
+        self.save()
+
+    def clear(self) -> None:
+        """Forget all files of this namespace."""
+        self._files.clear()
+        self.save()
+
+    def save(self) -> None:
+        """Write the manifest to disk."""
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self._manifest), encoding="utf-8")
+        os.replace(tmp_path, self.manifest_path)
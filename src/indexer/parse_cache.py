@@ -0,0 +1,146 @@
+"""On-disk cache of parsed code units keyed by file content.
+
+Entries are stored under a hash of the file content. A small index file per
+path records the file's mtime and size along with the key of its entry, so
+that unchanged files are served without reading or hashing their content.
+When a file changes, its index is overwritten and the superseded entry is
+deleted, so the cache holds one entry per file.
+"""
+
+import hashlib
+import mmap
+import os
+import pickle
+import shutil
+from pathlib import Path
+from typing import List, Optional, Union
+
+from src.config import settings
+from src.models.code_unit import CodeUnit
+from src.parser.base_parser import BaseParser, decode_source, open_source
+from src.parser.tree_sitter_support import tree_sitter_languages
+from src.utils.logger import setup_logger
+
+logger = setup_logger("indexer.parse_cache")
+
+# Bump whenever parser output changes so that stale entries are not reused
+_CACHE_VERSION = 6
+
+_CACHE_DIR = Path(settings.chroma_persist_directory) / "parse_cache"
+
+
+def _new_digest(parser: BaseParser, file_path: str) -> "hashlib.blake2b":
+    """Start a hash of everything besides the file that the parse result depends on."""
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(
+        f"{_CACHE_VERSION}\0{parser.__class__.__name__}\0{file_path}\0"
+        f"{settings.enable_statement_chunking}\0{settings.max_statements_per_function}\0"
+        f"{sorted(tree_sitter_languages())}\0".encode()
+    )
+    return digest
+
+
+def _cache_key(parser: BaseParser, file_path: str, data: Union[bytes, mmap.mmap]) -> str:
+    """Hash the file content together with the parser configuration."""
+    digest = _new_digest(parser, file_path)
+    digest.update(data)
+    return digest.hexdigest()
+
+
+def _stat_index_path(parser: BaseParser, file_path: str) -> Path:
+    """Get the index file recording the stat and cache key of a file as last cached."""
+    key = _new_digest(parser, file_path).hexdigest()
+    return _CACHE_DIR / "stat" / key[:2] / key
+
+
+def _entry_path(key: str) -> Path:
+    """Get the path of the cache entry for a content key."""
+    return _CACHE_DIR / key[:2] / f"{key}.pickle"
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Write a file so that concurrent readers never see it half-written."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _load_entry(cache_path: Path) -> Optional[List[CodeUnit]]:
+    """Load a cache entry, or return None if it is missing or unreadable."""
+    try:
+        with open(cache_path, "rb") as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable parse cache entry {cache_path}: {e}")
+        return None
+
+
+def parse_file_cached(parser: BaseParser, file_path: str) -> List[CodeUnit]:
+    """Parse a file, reusing the units of a previous parse of identical content.
+
+    Args:
+        parser: Parser for the file's language
+        file_path: Path to the source file
+
+    Returns:
+        List of extracted code units
+    """
+    if not settings.parse_cache_enabled:
+        return parser.parse_file(file_path)
+
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return parser.parse_file(file_path)
+    index_path = _stat_index_path(parser, file_path)
+    stat_tag = f"{st.st_mtime_ns} {st.st_size}"
+
+    # Fast path: the file is unchanged since it was last cached
+    previous_key = None
+    try:
+        cached_mtime, cached_size, previous_key = index_path.read_text().split()
+        if f"{cached_mtime} {cached_size}" == stat_tag:
+            cached = _load_entry(_entry_path(previous_key))
+            if cached is not None:
+                return cached
+    except (OSError, ValueError):
+        pass
+
+    try:
+        with open_source(file_path) as data:
+            key = _cache_key(parser, file_path, data)
+            cache_path = _entry_path(key)
+            code_units = _load_entry(cache_path)
+            # Only decode on a miss
+            source_code = decode_source(data, file_path) if code_units is None else None
+    except OSError:
+        # Let the parser report the problem as usual
+        return parser.parse_file(file_path)
+
+    fresh = code_units is None
+    if fresh:
+        code_units = parser.parse_source(source_code, file_path)
+
+    try:
+        if fresh:
+            _write_atomic(
+                cache_path, pickle.dumps(code_units, protocol=pickle.HIGHEST_PROTOCOL)
+            )
+        _write_atomic(index_path, f"{stat_tag} {key}".encode())
+        if previous_key is not None and previous_key != key:
+            # The file changed, so its previous entry can no longer be served
+            _entry_path(previous_key).unlink(missing_ok=True)
+    except OSError as e:
+        logger.warning(f"Could not write parse cache entry {cache_path}: {e}")
+
+    return code_units
+
+
+def clear_parse_cache() -> None:
+    """Delete all cached parse results, e.g. together with the vector store."""
+    shutil.rmtree(_CACHE_DIR, ignore_errors=True)
+    logger.info("Cleared parse cache")
@@ -1,5 +1,5 @@
 """Models package."""
 
-from src.models.code_unit import CodeUnit, CodeUnitType
+from src.models.code_unit import CodeUnit, CodeUnitBatch, CodeUnitType
 
-__all__ = ["CodeUnit", "CodeUnitType"]
+__all__ = ["CodeUnit", "CodeUnitBatch", "CodeUnitType"]
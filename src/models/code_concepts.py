@@ -1,7 +1,8 @@
 """Universal programming concepts for cross-language understanding."""
 
 from enum import Enum
-from typing import List, Set
+from functools import lru_cache
+from typing import List, Set, Tuple
 
 
 class CodeConcept(str, Enum):
@@ -115,18 +116,57 @@ class ConceptDetector:
         Returns:
             List of detected concepts
         """
+        if not code:
+            return []
+        
         concepts: Set[CodeConcept] = set()
         code_lower = code.lower()
         
-        for concept, patterns in ConceptDetector.CONCEPT_PATTERNS.items():
-            if language in patterns:
-                for pattern in patterns[language]:
-                    if pattern.lower() in code_lower or pattern in code:
-                        concepts.add(concept)
-                        break
+        for concept, patterns in ConceptDetector._lowercase_patterns(language):
+            for pattern in patterns:
+                if pattern in code_lower:
+                    concepts.add(concept)
+                    break
         
         return list(concepts)
     
+    @staticmethod
+    def detect_concepts_with_offsets(code: str, language: str) -> List[Tuple[int, CodeConcept]]:
+        """Find every occurrence of a concept pattern in code.
+        
+        Scanning a whole file once and mapping the hits to code units avoids
+        re-scanning text shared by nested units.
+        
+        Args:
+            code: Source code
+            language: Programming language (python, javascript, java, go)
+            
+        Returns:
+            (offset into code.lower(), concept) pairs sorted by offset
+        """
+        code_lower = code.lower()
+        hits: List[Tuple[int, CodeConcept]] = []
+        
+        for concept, patterns in ConceptDetector._lowercase_patterns(language):
+            for pattern in patterns:
+                pos = code_lower.find(pattern)
+                while pos != -1:
+                    hits.append((pos, concept))
+                    pos = code_lower.find(pattern, pos + 1)
+        
+        hits.sort(key=lambda hit: hit[0])
+        return hits
+    
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _lowercase_patterns(language: str) -> Tuple[Tuple[CodeConcept, Tuple[str, ...]], ...]:
+        """Get (concept, lowercased patterns) pairs for a language, built once per language."""
+        return tuple(
+            (concept, tuple(pattern.lower() for pattern in patterns[language]))
+            for concept, patterns in ConceptDetector.CONCEPT_PATTERNS.items()
+            if language in patterns
+        )
+    
     @staticmethod
     def get_concept_description(concept: CodeConcept) -> str:
         """Get human-readable description of a concept."""
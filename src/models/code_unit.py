@@ -1,8 +1,11 @@
 """Data models for code units."""
 
+import hashlib
+import sys
+from array import array
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Optional, Dict, Any
-from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any, Iterable, List, Tuple
 
 
 class CodeUnitType(str, Enum):
@@ -16,25 +19,31 @@ class CodeUnitType(str, Enum):
     VARIABLE = "variable"
 
 
-class CodeUnit(BaseModel):
-    """Represents a semantic unit of code."""
-
-    id: Optional[str] = Field(None, description="Unique identifier")
-    type: CodeUnitType = Field(..., description="Type of code unit")
-    name: str = Field(..., description="Name of the code unit")
-    content: str = Field(..., description="Full source code content")
-    file_path: str = Field(..., description="Path to the source file")
-    start_line: int = Field(..., description="Starting line number")
-    end_line: int = Field(..., description="Ending line number")
-    language: str = Field(..., description="Programming language")
-    docstring: Optional[str] = Field(None, description="Documentation string")
-    signature: Optional[str] = Field(None, description="Function/method signature")
-    metadata: Dict[str, Any] = Field(default_factory=dict, description="Additional metadata")
-
-    class Config:
-        """Pydantic config."""
-
-        use_enum_values = True
+@dataclass(**({"slots": True} if sys.version_info >= (3, 10) else {}))
+class CodeUnit:
+    """Represents a semantic unit of code.
+
+    A plain slotted dataclass rather than a validated model: parsers create
+    one instance per function/class/statement, so construction cost and
+    per-instance memory matter on large codebases.
+    """
+
+    type: str  # CodeUnitType value
+    name: str
+    content: str  # Full source code content
+    file_path: str
+    start_line: int
+    end_line: int
+    language: str
+    id: Optional[str] = None
+    docstring: Optional[str] = None
+    signature: Optional[str] = None
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        # Store the plain string value, as callers compare and serialize it as text
+        if isinstance(self.type, CodeUnitType):
+            self.type = self.type.value
 
     def to_searchable_text(self) -> str:
         """Convert code unit to searchable text representation.
@@ -57,3 +66,146 @@ class CodeUnit(BaseModel):
     def __str__(self) -> str:
         """String representation."""
         return f"{self.type.upper()}: {self.name} ({self.file_path}:{self.start_line}-{self.end_line})"
+
+
+class CodeUnitBatch:
+    """Columnar (struct-of-lists) buffer of code units for vector-store ingestion.
+
+    Units are split into one list per stored field as they are appended, so
+    building the ids/documents/metadatas payload for ChromaDB is a zip over
+    columns instead of repeated attribute walks over CodeUnit objects.
+    """
+
+    __slots__ = (
+        "keys", "documents", "types", "names", "file_paths", "start_lines", "end_lines",
+        "languages", "signatures", "docstrings", "concepts", "imports", "complexities",
+        "has_docs", "param_counts",
+    )
+
+    def __init__(self):
+        """Create an empty batch."""
+        self.keys: List[str] = []
+        self.documents: List[str] = []
+        self.types: List[str] = []
+        self.names: List[str] = []
+        self.file_paths: List[str] = []
+        self.start_lines = array("q")
+        self.end_lines = array("q")
+        self.languages: List[str] = []
+        self.signatures: List[str] = []
+        self.docstrings: List[str] = []
+        self.concepts: List[str] = []
+        self.imports: List[str] = []
+        self.complexities: List[int] = []
+        self.has_docs: List[bool] = []
+        self.param_counts: List[int] = []
+
+    @classmethod
+    def from_units(
+        cls, code_units: Iterable[CodeUnit], documents: Optional[Iterable[str]] = None
+    ) -> "CodeUnitBatch":
+        """Build a batch from code units.
+
+        Args:
+            code_units: Code units to add
+            documents: Their searchable texts, if already computed
+
+        Returns:
+            New batch
+        """
+        batch = cls()
+        if documents is None:
+            batch.extend(code_units)
+        else:
+            for cu, document in zip(code_units, documents):
+                batch.append(cu, document)
+        return batch
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def append(self, cu: CodeUnit, document: Optional[str] = None) -> None:
+        """Append one code unit.
+
+        Args:
+            cu: Code unit to add
+            document: Its searchable text (computed if omitted)
+        """
+        metadata = cu.metadata
+        # Readable key including name and type to avoid duplicates
+        self.keys.append(f"{cu.file_path}:{cu.type}:{cu.name}:{cu.start_line}-{cu.end_line}")
+        self.documents.append(cu.to_searchable_text() if document is None else document)
+        self.types.append(cu.type)
+        self.names.append(cu.name)
+        self.file_paths.append(cu.file_path)
+        self.start_lines.append(cu.start_line)
+        self.end_lines.append(cu.end_line)
+        self.languages.append(cu.language)
+        self.signatures.append(cu.signature or "")
+        self.docstrings.append(cu.docstring or "")
+        # Concepts are already stored as a comma-separated string
+        self.concepts.append(metadata.get("concepts", ""))
+        self.imports.append(metadata.get("imports", ""))
+        self.complexities.append(metadata.get("complexity", 0))
+        self.has_docs.append(metadata.get("has_docs", False))
+        self.param_counts.append(metadata.get("param_count", 0))
+
+    def extend(self, code_units: Iterable[CodeUnit]) -> None:
+        """Append several code units."""
+        for cu in code_units:
+            self.append(cu)
+
+    def to_chroma_payload(
+        self, start: int = 0, stop: Optional[int] = None
+    ) -> Tuple[List[str], List[str], List[Dict[str, Any]]]:
+        """Build the ChromaDB ids, documents and metadatas of a row range.
+
+        Args:
+            start: First row
+            stop: End row (exclusive); defaults to the end of the batch
+
+        Returns:
+            (ids, documents, metadatas)
+        """
+        rows = slice(start, stop)
+        keys = self.keys[rows]
+        # Fixed 32-character IDs; the readable key is kept in the metadata for debugging
+        ids = [hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest() for key in keys]
+        metadatas = [
+            {
+                "unit_key": key,
+                "type": unit_type,
+                "name": name,
+                "file_path": file_path,
+                "start_line": start_line,
+                "end_line": end_line,
+                "language": language,
+                "signature": signature,
+                "docstring": docstring,
+                "concepts": concepts,
+                "imports": imports,
+                "complexity": complexity,
+                "has_docs": has_docs,
+                "param_count": param_count,
+            }
+            for (
+                key, unit_type, name, file_path, start_line, end_line, language,
+                signature, docstring, concepts, imports, complexity, has_docs, param_count,
+            ) in zip(
+                keys,
+                self.types[rows],
+                self.names[rows],
+                self.file_paths[rows],
+                self.start_lines[rows],
+                self.end_lines[rows],
+                self.languages[rows],
+                self.signatures[rows],
+                self.docstrings[rows],
+                self.concepts[rows],
+                self.imports[rows],
+                self.complexities[rows],
+                self.has_docs[rows],
+                self.param_counts[rows],
+            )
+        ]
+        return ids, self.documents[rows], metadatas
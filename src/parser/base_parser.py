@@ -1,20 +1,248 @@
 """Base parser interface for all language parsers."""
 
+import bisect
+import mmap
+import os
+import re
 from abc import ABC, abstractmethod
-from typing import List
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple, Union
+from src.models.code_concepts import CodeConcept, ConceptDetector
 from src.models.code_unit import CodeUnit
+from src.utils.logger import setup_logger
+
+logger = setup_logger("parser.base")
+
+# Files at least this large are memory-mapped rather than read into a bytes copy
+MMAP_THRESHOLD = 64 * 1024
+
+_BRACE_RE = re.compile(r'[{}]')
+
+
+@contextmanager
+def open_source(file_path: str) -> Iterator[Union[bytes, mmap.mmap]]:
+    """Open the raw content of a source file.
+
+    Small files are read into bytes; large files are memory-mapped so that
+    hashing and decoding them does not need an extra in-memory copy.
+
+    Args:
+        file_path: Path to the source file
+
+    Yields:
+        Bytes-like content, only valid inside the with block
+    """
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < MMAP_THRESHOLD:
+            yield f.read()
+        else:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                yield mm
+
+
+def decode_source(data: Union[bytes, mmap.mmap], file_path: str) -> str:
+    """Decode source content with universal newlines, like a text-mode read.
+
+    Invalid UTF-8 bytes (e.g. Latin-1 comments in legacy sources) are replaced
+    with U+FFFD so that the rest of the file can still be parsed.
+
+    Args:
+        data: Raw file content
+        file_path: Path to the source file, for logging
+
+    Returns:
+        Decoded source code
+    """
+    try:
+        source_code = str(data, "utf-8")
+    except UnicodeDecodeError as e:
+        logger.debug(f"Replacing invalid UTF-8 in {file_path}: {e}")
+        source_code = str(data, "utf-8", "replace")
+    if "\r" in source_code:
+        source_code = source_code.replace("\r\n", "\n").replace("\r", "\n")
+    return source_code
 
 
 class BaseParser(ABC):
     """Abstract base class for language-specific parsers."""
 
-    @abstractmethod
     def parse_file(self, file_path: str) -> List[CodeUnit]:
         """Parse a source code file and extract code units.
 
         Args:
             file_path: Path to the source file
 
+        Returns:
+            List of extracted code units
+        """
+        try:
+            with open_source(file_path) as data:
+                source_code = decode_source(data, file_path)
+        except Exception as e:
+            logger.error(f"Error reading file {file_path}: {e}")
+            return []
+
+        return self.parse_source(source_code, file_path)
+
+    @staticmethod
+    def _newline_offsets(content: str) -> List[int]:
+        """Get the sorted offsets of all newlines in the source, for _line_number."""
+        offsets = []
+        pos = content.find('\n')
+        while pos != -1:
+            offsets.append(pos)
+            pos = content.find('\n', pos + 1)
+        return offsets
+
+    @staticmethod
+    def _line_number(nl_offsets: List[int], pos: int) -> int:
+        """Get the 1-based line number of a source offset in O(log n).
+
+        Args:
+            nl_offsets: Newline offsets from _newline_offsets
+            pos: Offset into the source
+
+        Returns:
+            Line number containing the offset
+        """
+        return bisect.bisect_left(nl_offsets, pos) + 1
+
+    @staticmethod
+    def _annotate_concepts(source_code: str, code_units: List[CodeUnit], language: str) -> None:
+        """Set the 'concepts' metadata of code units from one scan of the whole source.
+
+        Every unit gets the concepts with a pattern occurrence within its lines,
+        exactly as if its own content had been scanned. Patterns never span
+        lines and a unit's content is made of whole source lines.
+
+        Args:
+            source_code: Source code the units were extracted from
+            code_units: Code units to annotate
+            language: Programming language (python, javascript, java, go)
+        """
+        nl_offsets = BaseParser._newline_offsets(source_code.lower())
+        concept_lines: Dict[CodeConcept, List[int]] = {}
+        for offset, concept in ConceptDetector.detect_concepts_with_offsets(source_code, language):
+            lines = concept_lines.setdefault(concept, [])
+            line = BaseParser._line_number(nl_offsets, offset)
+            if not lines or lines[-1] != line:
+                lines.append(line)
+
+        for unit in code_units:
+            concepts = []
+            for concept, lines in concept_lines.items():
+                i = bisect.bisect_left(lines, unit.start_line)
+                if i < len(lines) and lines[i] <= unit.end_line:
+                    concepts.append(concept.value)
+            if concepts:
+                unit.metadata['concepts'] = ','.join(concepts)
+
+    def _find_closing_brace(self, lines: List[str], start_line: int) -> int:
+        """Find the closing brace for a code block.
+
+        Lines that cannot close the block are tallied with str.count; only a
+        line whose closing braces may bring the count back to zero is scanned
+        character by character.
+
+        Args:
+            lines: Source lines
+            start_line: 0-based index of the line opening the block
+
+        Returns:
+            1-based line number of the closing brace, or the last line
+        """
+        brace_count = 0
+        in_block = False
+
+        for i in range(start_line, len(lines)):
+            line = lines[i]
+            closes = line.count('}')
+            if not closes or (in_block and closes < brace_count):
+                opens = line.count('{')
+                brace_count += opens - closes
+                in_block = in_block or opens > 0
+                continue
+
+            for char in line:
+                if char == '{':
+                    brace_count += 1
+                    in_block = True
+                elif char == '}':
+                    brace_count -= 1
+                    if in_block and brace_count == 0:
+                        return i + 1
+
+        return len(lines)
+
+    def _iter_braces(self, content: str) -> Iterator[Tuple[int, str]]:
+        """Yield the offset and character of every brace that opens or closes a block."""
+        for match in _BRACE_RE.finditer(content):
+            yield match.start(), match.group()
+
+    def _match_braces(self, content: str) -> Dict[int, int]:
+        """Pair up the braces of the whole source in one pass.
+
+        Args:
+            content: Source code
+
+        Returns:
+            Mapping from the offset of each matched '{' to the offset of its '}'
+        """
+        block_ends = {}
+        open_offsets = []
+        for offset, char in self._iter_braces(content):
+            if char == '{':
+                open_offsets.append(offset)
+            elif open_offsets:
+                block_ends[open_offsets.pop()] = offset
+        return block_ends
+
+    def _find_block_end(
+        self,
+        content: str,
+        lines: List[str],
+        nl_offsets: List[int],
+        block_ends: Dict[int, int],
+        start_line: int,
+    ) -> int:
+        """Find the closing brace for a code block in O(1).
+
+        Gives the same result as _find_closing_brace, by looking up the first
+        '{' from the start of the line in the pairs from _match_braces. Falls
+        back to _find_closing_brace when a '}' or a string literal precedes
+        that '{', which the pairs do not account for, or when that '{' is not
+        paired, e.g. because a subclass's _iter_braces skipped it as a comment.
+
+        Args:
+            content: Source code
+            lines: Source lines
+            nl_offsets: Newline offsets from _newline_offsets
+            block_ends: Brace pairs from _match_braces
+            start_line: 0-based index of the line opening the block
+
+        Returns:
+            1-based line number of the closing brace, or the last line
+        """
+        line_offset = nl_offsets[start_line - 1] + 1 if start_line else 0
+        open_offset = content.find('{', line_offset)
+        if open_offset == -1:
+            return len(lines)
+        prefix = content[line_offset:open_offset]
+        if '}' in prefix or '"' in prefix:
+            return self._find_closing_brace(lines, start_line)
+        close_offset = block_ends.get(open_offset)
+        if close_offset is None:
+            return self._find_closing_brace(lines, start_line)
+        return self._line_number(nl_offsets, close_offset)
+
+    @abstractmethod
+    def parse_source(self, source_code: str, file_path: str) -> List[CodeUnit]:
+        """Parse source code held in memory and extract code units.
+
+        Args:
+            source_code: Source code to parse
+            file_path: Path recorded on the extracted code units
+
         Returns:
             List of extracted code units
         """
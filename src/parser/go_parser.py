@@ -1,14 +1,32 @@
-"""Go parser using regex patterns."""
+"""Go parser using tree-sitter, falling back to regex patterns."""
 
 import re
-from typing import List
+from typing import TYPE_CHECKING, Dict, List
 
 from src.models.code_unit import CodeUnit, CodeUnitType
 from src.parser.base_parser import BaseParser
+from src.parser.tree_sitter_support import (
+    find_nodes,
+    get_tree_sitter_parser,
+    node_text,
+    params_text,
+)
 from src.utils.logger import setup_logger
 
+if TYPE_CHECKING:
+    from tree_sitter import Parser
+
 logger = setup_logger("parser.go")
 
+# Function declarations: func name(...) ... {
+# Also handles methods: func (receiver Type) name(...) ... {
+_GO_FUNC_RE = re.compile(
+    r'func\s+(?:\([^)]+\)\s+)?(\w+)\s*\(([^)]*)\)(?:\s*\([^)]*\)|\s+\w+)?\s*\{'
+)
+_GO_STRUCT_RE = re.compile(r'type\s+(\w+)\s+struct\s*\{')
+
+_TS_NODE_TYPES = frozenset({'function_declaration', 'method_declaration', 'type_spec'})
+
 
 class GoParser(BaseParser):
     """Parser for Go files."""
@@ -17,36 +35,39 @@ class GoParser(BaseParser):
         """Get supported file extensions."""
         return ['.go']
 
-    def parse_file(self, file_path: str) -> List[CodeUnit]:
-        """Parse a Go file.
+    def parse_source(self, content: str, file_path: str) -> List[CodeUnit]:
+        """Parse Go source code.
 
         Args:
+            content: Source code
             file_path: Path to the file
 
         Returns:
             List of code units
         """
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-
             code_units = []
             lines = content.split('\n')
 
-            # Extract functions
-            code_units.extend(self._extract_functions(content, lines, file_path))
-
-            # Extract structs (Go's version of classes)
-            code_units.extend(self._extract_structs(content, lines, file_path))
+            ts_parser = get_tree_sitter_parser('go')
+            if ts_parser is not None:
+                code_units = self._extract_with_tree_sitter(ts_parser, content, lines, file_path)
+            else:
+                nl_offsets = self._newline_offsets(content)
+                block_ends = self._match_braces(content)
+
+                # Extract functions
+                code_units.extend(
+                    self._extract_functions(content, lines, nl_offsets, block_ends, file_path)
+                )
+
+                # Extract structs (Go's version of classes)
+                code_units.extend(
+                    self._extract_structs(content, lines, nl_offsets, block_ends, file_path)
+                )
             
             # Detect concepts for all code units
-            from src.models.code_concepts import ConceptDetector
-            for unit in code_units:
-                concepts = ConceptDetector.detect_concepts(unit.content, 'go')
-                if concepts:
-                    if unit.metadata is None:
-                        unit.metadata = {}
-                    unit.metadata['concepts'] = ','.join([c.value for c in concepts])
+            self._annotate_concepts(content, code_units, 'go')
 
             logger.info(f"Parsed {len(code_units)} code units from {file_path}")
             return code_units
@@ -55,21 +76,67 @@ class GoParser(BaseParser):
             logger.error(f"Error parsing file {file_path}: {e}")
             return []
 
-    def _extract_functions(self, content: str, lines: List[str], file_path: str) -> List[CodeUnit]:
-        """Extract function declarations."""
+    def _extract_with_tree_sitter(
+        self, ts_parser: "Parser", content: str, lines: List[str], file_path: str
+    ) -> List[CodeUnit]:
+        """Extract functions, methods and structs from a tree-sitter syntax tree."""
         code_units = []
+        tree = ts_parser.parse(content.encode('utf-8'))
+
+        for node in find_nodes(tree.root_node, 'go', _TS_NODE_TYPES):
+            name = node_text(node.child_by_field_name('name'))
+            if name is None:
+                continue
+
+            if node.type == 'type_spec':
+                type_node = node.child_by_field_name('type')
+                if type_node is None or type_node.type != 'struct_type':
+                    continue
+                unit_type = CodeUnitType.CLASS  # Using CLASS type for structs
+                signature = f"type {name} struct"
+                metadata = {}
+            else:
+                params = params_text(node.child_by_field_name('parameters'))
+                unit_type = CodeUnitType.FUNCTION
+                signature = f"func {name}({params})"
+                metadata = {'params': params}
+
+            start_line = node.start_point[0] + 1
+            end_line = node.end_point[0] + 1
+
+            code_units.append(CodeUnit(
+                type=unit_type,
+                name=name,
+                content='\n'.join(lines[start_line - 1:end_line]),
+                file_path=file_path,
+                start_line=start_line,
+                end_line=end_line,
+                language='go',
+                docstring=self._extract_godoc(lines, start_line - 1),
+                signature=signature,
+                metadata=metadata
+            ))
+
+        return code_units
 
-        # Pattern for function declarations: func name(...) ... { ... }
-        # Also handles methods: func (receiver Type) name(...) ... { ... }
-        func_pattern = r'func\s+(?:\([^)]+\)\s+)?(\w+)\s*\(([^)]*)\)(?:\s*\([^)]*\)|\s+\w+)?\s*\{'
+    def _extract_functions(
+        self,
+        content: str,
+        lines: List[str],
+        nl_offsets: List[int],
+        block_ends: Dict[int, int],
+        file_path: str,
+    ) -> List[CodeUnit]:
+        """Extract function declarations."""
+        code_units = []
 
-        for match in re.finditer(func_pattern, content):
+        for match in _GO_FUNC_RE.finditer(content):
             name = match.group(1)
             params = match.group(2).strip()
             start_pos = match.start()
 
-            start_line = content[:start_pos].count('\n') + 1
-            end_line = self._find_closing_brace(lines, start_line - 1)
+            start_line = self._line_number(nl_offsets, start_pos)
+            end_line = self._find_block_end(content, lines, nl_offsets, block_ends, start_line - 1)
 
             func_content = '\n'.join(lines[start_line - 1:end_line])
             docstring = self._extract_godoc(lines, start_line - 1)
@@ -89,19 +156,23 @@ class GoParser(BaseParser):
 
         return code_units
 
-    def _extract_structs(self, content: str, lines: List[str], file_path: str) -> List[CodeUnit]:
+    def _extract_structs(
+        self,
+        content: str,
+        lines: List[str],
+        nl_offsets: List[int],
+        block_ends: Dict[int, int],
+        file_path: str,
+    ) -> List[CodeUnit]:
         """Extract struct declarations."""
         code_units = []
 
-        # Pattern for struct declarations
-        struct_pattern = r'type\s+(\w+)\s+struct\s*\{'
-
-        for match in re.finditer(struct_pattern, content):
+        for match in _GO_STRUCT_RE.finditer(content):
             name = match.group(1)
             start_pos = match.start()
 
-            start_line = content[:start_pos].count('\n') + 1
-            end_line = self._find_closing_brace(lines, start_line - 1)
+            start_line = self._line_number(nl_offsets, start_pos)
+            end_line = self._find_block_end(content, lines, nl_offsets, block_ends, start_line - 1)
 
             struct_content = '\n'.join(lines[start_line - 1:end_line])
             docstring = self._extract_godoc(lines, start_line - 1)
@@ -116,29 +187,10 @@ class GoParser(BaseParser):
                 language='go',
                 docstring=docstring,
                 signature=f"type {name} struct",
-                metadata={}
             ))
 
         return code_units
 
-    def _find_closing_brace(self, lines: List[str], start_line: int) -> int:
-        """Find the closing brace for a code block."""
-        brace_count = 0
-        in_block = False
-
-        for i in range(start_line, len(lines)):
-            line = lines[i]
-            for char in line:
-                if char == '{':
-                    brace_count += 1
-                    in_block = True
-                elif char == '}':
-                    brace_count -= 1
-                    if in_block and brace_count == 0:
-                        return i + 1
-
-        return len(lines)
-
     def _extract_godoc(self, lines: List[str], func_line: int) -> str:
         """Extract GoDoc comment before a function/struct."""
         if func_line == 0:
@@ -148,10 +200,11 @@ class GoParser(BaseParser):
         for i in range(func_line - 1, max(func_line - 20, -1), -1):
             line = lines[i].strip()
             if line.startswith('//'):
-                doc_lines.insert(0, line[2:].strip())
+                doc_lines.append(line[2:].strip())
             elif not line:
                 continue
             else:
                 break
 
-        return '\n'.join(doc_lines) if doc_lines else None
+        # Collected bottom-up
+        return '\n'.join(reversed(doc_lines)) if doc_lines else None
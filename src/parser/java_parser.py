@@ -1,14 +1,43 @@
-"""Java parser using regex patterns."""
+"""Java parser using tree-sitter, falling back to regex patterns."""
 
 import re
-from typing import List
+from typing import TYPE_CHECKING, Dict, Iterator, List, Tuple
 
 from src.models.code_unit import CodeUnit, CodeUnitType
 from src.parser.base_parser import BaseParser
+from src.parser.tree_sitter_support import (
+    find_nodes,
+    get_tree_sitter_parser,
+    node_text,
+    params_text,
+)
 from src.utils.logger import setup_logger
 
+if TYPE_CHECKING:
+    from tree_sitter import Parser
+
 logger = setup_logger("parser.java")
 
+# Adjacent optional parts are written so that every whitespace run can be
+# matched in only one way, and matches may not start inside a whitespace run
+# (or, for methods, inside a word), where they would only fail again after
+# rescanning it. The original '\s*(?:static)?\s*(?:final)?\s*' spelling
+# backtracked polynomially (seconds to minutes) on long runs of whitespace.
+# The leading character class lets the class pattern reject most positions
+# with a single test, as no literal prefix is available to skip ahead with.
+_JAVA_CLASS_RE = re.compile(
+    r'(?=[pafc\s])(?!(?<=\s)\s)(?:public|private|protected)?\s*(?:(?:abstract|final)\s*)?'
+    r'class\s+(\w+)(?:\s+extends\s+(\w+))?(?:\s+implements\s+([^{]+)\{|\s*\{)'
+)
+_JAVA_METHOD_RE = re.compile(
+    r'(?!(?<=\s)\s|(?<=\w)\w)(?:public|private|protected)?\s*(?:static\s*)?(?:final\s*)?'
+    r'(?:\w+(?:<[^>]+>)?)\s+(\w+)\s*\(([^)]*)\)\s*(?:throws\s[^{]+)?\{'
+)
+
+_BRACE_OR_STRING_RE = re.compile(r'[{}"\n]')
+
+_TS_NODE_TYPES = frozenset({'class_declaration', 'method_declaration', 'constructor_declaration'})
+
 
 class JavaParser(BaseParser):
     """Parser for Java files."""
@@ -17,36 +46,39 @@ class JavaParser(BaseParser):
         """Get supported file extensions."""
         return ['.java']
 
-    def parse_file(self, file_path: str) -> List[CodeUnit]:
-        """Parse a Java file.
+    def parse_source(self, content: str, file_path: str) -> List[CodeUnit]:
+        """Parse Java source code.
 
         Args:
+            content: Source code
             file_path: Path to the file
 
         Returns:
             List of code units
         """
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-
             code_units = []
             lines = content.split('\n')
 
-            # Extract classes
-            code_units.extend(self._extract_classes(content, lines, file_path))
-
-            # Extract methods
-            code_units.extend(self._extract_methods(content, lines, file_path))
+            ts_parser = get_tree_sitter_parser('java')
+            if ts_parser is not None:
+                code_units = self._extract_with_tree_sitter(ts_parser, content, lines, file_path)
+            else:
+                nl_offsets = self._newline_offsets(content)
+                block_ends = self._match_braces(content)
+
+                # Extract classes
+                code_units.extend(
+                    self._extract_classes(content, lines, nl_offsets, block_ends, file_path)
+                )
+
+                # Extract methods
+                code_units.extend(
+                    self._extract_methods(content, lines, nl_offsets, block_ends, file_path)
+                )
             
             # Detect concepts for all code units
-            from src.models.code_concepts import ConceptDetector
-            for unit in code_units:
-                concepts = ConceptDetector.detect_concepts(unit.content, 'java')
-                if concepts:
-                    if unit.metadata is None:
-                        unit.metadata = {}
-                    unit.metadata['concepts'] = ','.join([c.value for c in concepts])
+            self._annotate_concepts(content, code_units, 'java')
 
             logger.info(f"Parsed {len(code_units)} code units from {file_path}")
             return code_units
@@ -55,21 +87,71 @@ class JavaParser(BaseParser):
             logger.error(f"Error parsing file {file_path}: {e}")
             return []
 
-    def _extract_classes(self, content: str, lines: List[str], file_path: str) -> List[CodeUnit]:
-        """Extract class declarations."""
+    def _extract_with_tree_sitter(
+        self, ts_parser: "Parser", content: str, lines: List[str], file_path: str
+    ) -> List[CodeUnit]:
+        """Extract classes, methods and constructors from a tree-sitter syntax tree."""
         code_units = []
+        tree = ts_parser.parse(content.encode('utf-8'))
+
+        for node in find_nodes(tree.root_node, 'java', _TS_NODE_TYPES):
+            name = node_text(node.child_by_field_name('name'))
+            # Abstract and interface methods have no body
+            if name is None or node.child_by_field_name('body') is None:
+                continue
+
+            if node.type == 'class_declaration':
+                superclass = node.child_by_field_name('superclass')
+                interfaces = node.child_by_field_name('interfaces')
+                unit_type = CodeUnitType.CLASS
+                signature = f"class {name}"
+                metadata = {
+                    'extends': node_text(superclass.named_children[-1]) if superclass else None,
+                    'implements': node_text(interfaces.named_children[-1]) if interfaces else None,
+                }
+            else:
+                params = params_text(node.child_by_field_name('parameters'))
+                unit_type = CodeUnitType.METHOD
+                signature = f"{name}({params})"
+                metadata = {'params': params}
+
+            start_line = node.start_point[0] + 1
+            end_line = node.end_point[0] + 1
+
+            code_units.append(CodeUnit(
+                type=unit_type,
+                name=name,
+                content='\n'.join(lines[start_line - 1:end_line]),
+                file_path=file_path,
+                start_line=start_line,
+                end_line=end_line,
+                language='java',
+                docstring=self._extract_javadoc(lines, start_line - 1),
+                signature=signature,
+                metadata=metadata
+            ))
+
+        return code_units
 
-        # Pattern for class declarations
-        class_pattern = r'(?:public|private|protected)?\s*(?:abstract|final)?\s*class\s+(\w+)(?:\s+extends\s+(\w+))?(?:\s+implements\s+([^{]+))?\s*\{'
+    def _extract_classes(
+        self,
+        content: str,
+        lines: List[str],
+        nl_offsets: List[int],
+        block_ends: Dict[int, int],
+        file_path: str,
+    ) -> List[CodeUnit]:
+        """Extract class declarations."""
+        code_units = []
 
-        for match in re.finditer(class_pattern, content):
+        for match in _JAVA_CLASS_RE.finditer(content):
             name = match.group(1)
             extends = match.group(2)
             implements = match.group(3)
             start_pos = match.start()
 
-            start_line = content[:start_pos].count('\n') + 1
-            end_line = self._find_closing_brace(lines, start_line - 1)
+            start_line = self._line_number(nl_offsets, start_pos)
+            end_line = self._find_block_end(content, lines, nl_offsets, block_ends, start_line - 1)
 
             class_content = '\n'.join(lines[start_line - 1:end_line])
             docstring = self._extract_javadoc(lines, start_line - 1)
@@ -89,14 +171,18 @@ class JavaParser(BaseParser):
 
         return code_units
 
-    def _extract_methods(self, content: str, lines: List[str], file_path: str) -> List[CodeUnit]:
+    def _extract_methods(
+        self,
+        content: str,
+        lines: List[str],
+        nl_offsets: List[int],
+        block_ends: Dict[int, int],
+        file_path: str,
+    ) -> List[CodeUnit]:
         """Extract method declarations."""
         code_units = []
 
-        # Pattern for method declarations
-        method_pattern = r'(?:public|private|protected)?\s*(?:static)?\s*(?:final)?\s*(?:\w+(?:<[^>]+>)?)\s+(\w+)\s*\(([^)]*)\)\s*(?:throws\s+[^{]+)?\s*\{'
-
-        for match in re.finditer(method_pattern, content):
+        for match in _JAVA_METHOD_RE.finditer(content):
             name = match.group(1)
             params = match.group(2).strip()
             start_pos = match.start()
@@ -105,8 +191,8 @@ class JavaParser(BaseParser):
             if name in ['if', 'while', 'for', 'switch', 'catch']:
                 continue
 
-            start_line = content[:start_pos].count('\n') + 1
-            end_line = self._find_closing_brace(lines, start_line - 1)
+            start_line = self._line_number(nl_offsets, start_pos)
+            end_line = self._find_block_end(content, lines, nl_offsets, block_ends, start_line - 1)
 
             method_content = '\n'.join(lines[start_line - 1:end_line])
             docstring = self._extract_javadoc(lines, start_line - 1)
@@ -126,17 +212,42 @@ class JavaParser(BaseParser):
 
         return code_units
 
+    def _iter_braces(self, content: str) -> Iterator[Tuple[int, str]]:
+        """Yield the offset and character of every brace outside string literals.
+
+        Mirrors _find_closing_brace: a string literal never spans lines.
+        """
+        in_string = False
+        for match in _BRACE_OR_STRING_RE.finditer(content):
+            offset = match.start()
+            char = match.group()
+            if char == '\n':
+                in_string = False
+            elif char == '"':
+                if offset == 0 or content[offset - 1] != '\\':
+                    in_string = not in_string
+            elif not in_string:
+                yield offset, char
+
     def _find_closing_brace(self, lines: List[str], start_line: int) -> int:
-        """Find the closing brace for a code block."""
+        """Find the closing brace for a code block, ignoring braces in string literals."""
         brace_count = 0
         in_block = False
 
         for i in range(start_line, len(lines)):
             line = lines[i]
+            closes = line.count('}')
+            if '"' not in line and (not closes or (in_block and closes < brace_count)):
+                # No string literal and no way to close the block on this line
+                opens = line.count('{')
+                brace_count += opens - closes
+                in_block = in_block or opens > 0
+                continue
+
             # Skip string literals
             in_string = False
-            for char in line:
-                if char == '"' and (i == 0 or line[i-1] != '\\'):
+            for j, char in enumerate(line):
+                if char == '"' and (j == 0 or line[j - 1] != '\\'):
                     in_string = not in_string
                 if not in_string:
                     if char == '{':
@@ -154,16 +265,12 @@ class JavaParser(BaseParser):
         if func_line == 0:
             return None
 
-        doc_lines = []
         for i in range(func_line - 1, max(func_line - 30, -1), -1):
             line = lines[i].strip()
             if line.startswith('*/'):
-                doc_lines.insert(0, line)
                 for j in range(i - 1, max(func_line - 30, -1), -1):
-                    doc_line = lines[j].strip()
-                    doc_lines.insert(0, doc_line)
-                    if doc_line.startswith('/**'):
-                        return '\n'.join(doc_lines)
+                    if lines[j].lstrip().startswith('/**'):
+                        return '\n'.join(doc_line.strip() for doc_line in lines[j:i + 1])
                 break
             elif not line or line.startswith('//') or line.startswith('@'):
                 continue
@@ -1,15 +1,85 @@
-"""JavaScript/TypeScript parser using regex patterns."""
+"""JavaScript/TypeScript parser using tree-sitter, falling back to regex patterns."""
 
 import re
-from typing import List
+from typing import TYPE_CHECKING, Dict, Iterator, List, Tuple
 from pathlib import Path
 
 from src.models.code_unit import CodeUnit, CodeUnitType
 from src.parser.base_parser import BaseParser
+from src.parser.tree_sitter_support import (
+    find_nodes,
+    get_tree_sitter_parser,
+    node_text,
+    params_text,
+)
 from src.utils.logger import setup_logger
+from src.utils.metadata_extractor import MetadataExtractor
+
+if TYPE_CHECKING:
+    from tree_sitter import Parser
 
 logger = setup_logger("parser.javascript")
 
+# Every declaration the parser extracts, matched in a single pass over the source.
+# Alternatives are tried in order, so a declaration is reported once: an async
+# arrow function is not also a plain arrow function and a function is not also a
+# class method.
+_JS_UNIT_RE = re.compile(
+    r'''
+    # function name(...) { ... }
+    (?P<function>(?:async\s+)?function\s+(?P<function_name>\w+)\s*
+        \((?P<function_params>[^)]*)\)\s*\{)
+    # const/let/var name = (...) => { ... }
+    | (?P<arrow>(?:const|let|var)\s+(?P<arrow_name>\w+)\s*=\s*(?:async\s+)?
+        \((?P<arrow_params>[^)]*)\)\s*=>\s*[{\(])
+    # const name = async (...) => ...
+    | (?P<async_arrow>(?:const|let|var)\s+(?P<async_arrow_name>\w+)\s*=\s*async\s*
+        \((?P<async_arrow_params>[^)]*)\)\s*=>)
+    # class Name extends Base { ... }
+    | (?P<class>class\s+(?P<class_name>\w+)(?:\s+extends\s+(?P<class_extends>\w+))?\s*\{)
+    # Any other class keyword, e.g. 'class A extends mixin(B) {'
+    | (?P<class_keyword>class\s+\w+)
+    # Class methods: async methodName(...), static methodName(...), methodName(...).
+    # Anchored at a word start so that a long identifier is not rescanned from
+    # each of its characters. Member calls and parameters with parentheses are
+    # rejected, so that a call such as 'app.get(path, function name(...) {' does
+    # not swallow the named function passed to it.
+    | (?P<method>(?<!\.)\b(?:async\s+|static\s+)?(?P<method_name>\w+)\s*
+        \((?P<method_params>[^()]*)\)\s*\{)
+    ''',
+    re.VERBOSE,
+)
+
+# Tokens whose braces do not open or close a block: comments, string literals and
+# regular expression literals (after a character that cannot end an operand), plus
+# the backtick that starts a template literal and the braces themselves
+_BRACE_TOKEN_RE = re.compile(
+    r'''
+    //[^\n]*
+    | /\*.*?(?:\*/|\Z)
+    | '[^'\\\n]*(?:\\.[^'\\\n]*)*'
+    | "[^"\\\n]*(?:\\.[^"\\\n]*)*"
+    | (?<=[(,=:\[!&|?{};])\s*/(?![/*])(?:\\.|\[(?:\\.|[^\]\\\n])*\]|[^/\\\n\[])+/
+    | [`{}]
+    ''',
+    re.VERBOSE | re.DOTALL,
+)
+# Template literal text up to its closing backtick or the next ${ substitution
+_TEMPLATE_TEXT_RE = re.compile(r'[^`\\$]*(?:(?:\\.|\$(?!\{))[^`\\$]*)*', re.DOTALL)
+
+# Keywords the method alternative matches that do not start a method
+_NON_METHOD_NAMES = frozenset({'function', 'if', 'for', 'while', 'switch', 'catch'})
+
+_TS_NODE_TYPES = frozenset({
+    'function_declaration',
+    'generator_function_declaration',
+    'function_expression',
+    'variable_declarator',
+    'class_declaration',
+    'method_definition',
+})
+# The JavaScript grammar cannot parse type annotations
+_TS_UNSUPPORTED_EXTENSIONS = frozenset({'.ts', '.tsx'})
 
 class JavaScriptParser(BaseParser):
     """Parser for JavaScript and TypeScript files."""
@@ -18,53 +88,46 @@ class JavaScriptParser(BaseParser):
         """Get supported file extensions."""
         return ['.js', '.jsx', '.ts', '.tsx', '.mjs']
 
-    def parse_file(self, file_path: str) -> List[CodeUnit]:
-        """Parse a JavaScript/TypeScript file.
+    def parse_source(self, content: str, file_path: str) -> List[CodeUnit]:
+        """Parse JavaScript/TypeScript source code.
 
         Args:
+            content: Source code
             file_path: Path to the file
 
         Returns:
             List of code units
         """
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-
-            code_units = []
             lines = content.split('\n')
 
-            # Extract functions
-            code_units.extend(self._extract_functions(content, lines, file_path))
-
-            # Extract classes
-            code_units.extend(self._extract_classes(content, lines, file_path))
-
-            # Extract methods
-            code_units.extend(self._extract_methods(content, lines, file_path))
+            # Extract functions, classes and methods
+            ts_parser = None
+            if Path(file_path).suffix not in _TS_UNSUPPORTED_EXTENSIONS:
+                ts_parser = get_tree_sitter_parser('javascript')
+            if ts_parser is not None:
+                code_units = self._extract_with_tree_sitter(ts_parser, content, lines, file_path)
+            else:
+                nl_offsets = self._newline_offsets(content)
+                block_ends = self._match_braces(content)
+                code_units = self._extract_code_units(
+                    content, lines, nl_offsets, block_ends, file_path
+                )
             
             # Detect concepts for all code units
-            from src.models.code_concepts import ConceptDetector
-            from src.utils.metadata_extractor import MetadataExtractor
-            
+            self._annotate_concepts(content, code_units, 'javascript')
+
             # Extract file-level imports
             file_imports = MetadataExtractor.extract_javascript_imports(content)
             
+            imports = ','.join(file_imports[:10])
+            
             for unit in code_units:
-                concepts = ConceptDetector.detect_concepts(unit.content, 'javascript')
-                if concepts:
-                    if unit.metadata is None:
-                        unit.metadata = {}
-                    unit.metadata['concepts'] = ','.join([c.value for c in concepts])
-                
                 # Add rich metadata
-                if unit.metadata is None:
-                    unit.metadata = {}
-                
-                unit.metadata['imports'] = ','.join(file_imports[:10])
-                unit.metadata['complexity'] = MetadataExtractor.calculate_complexity(unit.content)
-                unit.metadata['has_docs'] = MetadataExtractor.has_docstring(unit.content, 'javascript')
-                unit.metadata['param_count'] = len(MetadataExtractor.extract_parameters(unit.signature or '', 'javascript'))
+                unit.metadata['imports'] = imports
+                unit.metadata.update(
+                    MetadataExtractor.extract_all(unit.content, unit.signature, 'javascript')
+                )
 
             logger.info(f"Parsed {len(code_units)} code units from {file_path}")
             return code_units
@@ -73,163 +136,180 @@ class JavaScriptParser(BaseParser):
             logger.error(f"Error parsing file {file_path}: {e}")
             return []
 
-    def _extract_functions(self, content: str, lines: List[str], file_path: str) -> List[CodeUnit]:
-        """Extract function declarations."""
+    def _extract_with_tree_sitter(
+        self, ts_parser: "Parser", content: str, lines: List[str], file_path: str
+    ) -> List[CodeUnit]:
+        """Extract functions, classes and class methods from a tree-sitter syntax tree."""
         code_units = []
+        tree = ts_parser.parse(content.encode('utf-8'))
 
-        # Pattern 1: function name(...) { ... }
-        func_pattern = r'(?:async\s+)?function\s+(\w+)\s*\(([^)]*)\)\s*\{'
-        
-        # Pattern 2: const/let/var name = (...) => { ... }
-        arrow_pattern = r'(?:const|let|var)\s+(\w+)\s*=\s*(?:async\s+)?\(([^)]*)\)\s*=>\s*[{\(]'
-        
-        # Pattern 3: const name = async (...) => ...
-        arrow_async_pattern = r'(?:const|let|var)\s+(\w+)\s*=\s*async\s*\(([^)]*)\)\s*=>'
-
-        for pattern in [func_pattern, arrow_pattern, arrow_async_pattern]:
-            for match in re.finditer(pattern, content):
-                name = match.group(1)
-                params = match.group(2).strip() if match.group(2) else ''
-                start_pos = match.start()
-
-                # Find line number
-                start_line = content[:start_pos].count('\n') + 1
-
-                # Find end of function (simple brace matching)
-                end_line = self._find_closing_brace(lines, start_line - 1)
-
-                # Extract function body
-                func_content = '\n'.join(lines[start_line - 1:end_line])
-
-                # Extract JSDoc comment if present
-                docstring = self._extract_jsdoc(lines, start_line - 1)
-
-                code_units.append(CodeUnit(
-                    type=CodeUnitType.FUNCTION,
-                    name=name,
-                    content=func_content,
-                    file_path=file_path,
-                    start_line=start_line,
-                    end_line=end_line,
-                    language='javascript',
-                    docstring=docstring,
-                    signature=f"function {name}({params})",
-                    metadata={'params': params}
-                ))
-
-        return code_units
-    
-    def _extract_methods(self, content: str, lines: List[str], file_path: str) -> List[CodeUnit]:
-        """Extract class methods."""
-        code_units = []
-        
-        # Pattern for class methods: methodName(...) { ... }
-        # Matches: async methodName(...), static methodName(...), methodName(...)
-        method_pattern = r'(?:async\s+|static\s+)?(\w+)\s*\(([^)]*)\)\s*\{'
-        
-        # Only extract if inside a class (simple heuristic: check if preceded by class keyword)
-        class_regions = []
-        for match in re.finditer(r'class\s+\w+', content):
-            class_start = match.start()
-            class_regions.append(class_start)
-        
-        for match in re.finditer(method_pattern, content):
-            name = match.group(1)
-            params = match.group(2).strip() if match.group(2) else ''
-            start_pos = match.start()
-            
-            # Skip if it's a known function keyword or constructor
-            if name in ['function', 'if', 'for', 'while', 'switch', 'catch']:
-                continue
-            
-            # Check if inside a class (rough check)
-            in_class = any(start_pos > class_start for class_start in class_regions)
-            if not in_class:
+        for node in find_nodes(tree.root_node, 'javascript', _TS_NODE_TYPES):
+            name = node_text(node.child_by_field_name('name'))
+            if name is None:
                 continue
-            
-            # Find line number
-            start_line = content[:start_pos].count('\n') + 1
-            
-            # Find end of method
-            end_line = self._find_closing_brace(lines, start_line - 1)
-            
-            # Extract method body
-            method_content = '\n'.join(lines[start_line - 1:end_line])
-            
-            # Extract JSDoc
-            docstring = self._extract_jsdoc(lines, start_line - 1)
-            
+
+            if node.type == 'variable_declarator':
+                # const/let/var name = (...) => { ... } or = function (...) { ... }
+                value = node.child_by_field_name('value')
+                if value is None or value.type not in ('arrow_function', 'function_expression'):
+                    continue
+                params_node = value.child_by_field_name('parameters')
+                params = params_text(params_node or value.child_by_field_name('parameter'))
+                unit_type = CodeUnitType.FUNCTION
+                signature = f"function {name}({params})"
+                metadata = {'params': params}
+                # Span the whole declaration, starting at const/let/var
+                node = node.parent
+            elif node.type == 'class_declaration':
+                heritage = next((c for c in node.children if c.type == 'class_heritage'), None)
+                extends = node_text(heritage.named_children[-1]) if heritage else None
+                unit_type = CodeUnitType.CLASS
+                signature = f"class {name}" + (f" extends {extends}" if extends else "")
+                metadata = {'extends': extends}
+            else:
+                if node.type == 'function_expression' and (
+                    node.parent is not None and node.parent.type == 'variable_declarator'
+                ):
+                    # Already reported under the declared variable's name
+                    continue
+                params = params_text(node.child_by_field_name('parameters'))
+                metadata = {'params': params}
+                if node.type == 'method_definition':
+                    # Object literal methods are not class methods
+                    if node.parent is None or node.parent.type != 'class_body':
+                        continue
+                    unit_type = CodeUnitType.METHOD
+                    signature = f"{name}({params})"
+                else:
+                    unit_type = CodeUnitType.FUNCTION
+                    signature = f"function {name}({params})"
+
+            start_line = node.start_point[0] + 1
+            end_line = node.end_point[0] + 1
+
             code_units.append(CodeUnit(
-                type=CodeUnitType.METHOD,
+                type=unit_type,
                 name=name,
-                content=method_content,
+                content='\n'.join(lines[start_line - 1:end_line]),
                 file_path=file_path,
                 start_line=start_line,
                 end_line=end_line,
                 language='javascript',
-                docstring=docstring,
-                signature=f"{name}({params})",
-                metadata={'params': params}
+                docstring=self._extract_jsdoc(lines, start_line - 1),
+                signature=signature,
+                metadata=metadata
             ))
-        
+
         return code_units
 
-    def _extract_classes(self, content: str, lines: List[str], file_path: str) -> List[CodeUnit]:
-        """Extract class declarations."""
+    def _extract_code_units(
+        self,
+        content: str,
+        lines: List[str],
+        nl_offsets: List[int],
+        block_ends: Dict[int, int],
+        file_path: str,
+    ) -> List[CodeUnit]:
+        """Extract functions, classes and class methods in one scan of the source."""
         code_units = []
+        # Last line of the class bodies seen so far; methods must start inside one
+        class_end_line = 0
+
+        for match in _JS_UNIT_RE.finditer(content):
+            kind = match.lastgroup
+            start_line = self._line_number(nl_offsets, match.start())
+            if kind == 'class_keyword':
+                end_line = self._find_block_end(
+                    content, lines, nl_offsets, block_ends, start_line - 1
+                )
+                class_end_line = max(class_end_line, end_line)
+                continue
 
-        # Pattern for class declarations
-        class_pattern = r'class\s+(\w+)(?:\s+extends\s+(\w+))?\s*\{'
-
-        for match in re.finditer(class_pattern, content):
-            name = match.group(1)
-            extends = match.group(2) if match.group(2) else None
-            start_pos = match.start()
-
-            # Find line number
-            start_line = content[:start_pos].count('\n') + 1
-
-            # Find end of class
-            end_line = self._find_closing_brace(lines, start_line - 1)
-
-            # Extract class body
-            class_content = '\n'.join(lines[start_line - 1:end_line])
-
-            # Extract JSDoc comment
+            if kind == 'class':
+                name = match.group('class_name')
+                extends = match.group('class_extends')
+                unit_type = CodeUnitType.CLASS
+                signature = f"class {name}" + (f" extends {extends}" if extends else "")
+                metadata = {'extends': extends}
+            else:
+                name = match.group(f'{kind}_name')
+                params = (match.group(f'{kind}_params') or '').strip()
+                metadata = {'params': params}
+                if kind == 'method':
+                    if name in _NON_METHOD_NAMES or start_line > class_end_line:
+                        continue
+                    unit_type = CodeUnitType.METHOD
+                    signature = f"{name}({params})"
+                else:
+                    unit_type = CodeUnitType.FUNCTION
+                    signature = f"function {name}({params})"
+
+            # Find end of block (simple brace matching)
+            end_line = self._find_block_end(content, lines, nl_offsets, block_ends, start_line - 1)
+            if kind == 'class':
+                class_end_line = max(class_end_line, end_line)
+
+            # Extract body and JSDoc comment if present
+            unit_content = '\n'.join(lines[start_line - 1:end_line])
             docstring = self._extract_jsdoc(lines, start_line - 1)
 
             code_units.append(CodeUnit(
-                type=CodeUnitType.CLASS,
+                type=unit_type,
                 name=name,
-                content=class_content,
+                content=unit_content,
                 file_path=file_path,
                 start_line=start_line,
                 end_line=end_line,
                 language='javascript',
                 docstring=docstring,
-                signature=f"class {name}" + (f" extends {extends}" if extends else ""),
-                metadata={'extends': extends}
+                signature=signature,
+                metadata=metadata
             ))
 
         return code_units
 
-    def _find_closing_brace(self, lines: List[str], start_line: int) -> int:
-        """Find the closing brace for a code block."""
-        brace_count = 0
-        in_block = False
+    def _iter_braces(self, content: str) -> Iterator[Tuple[int, str]]:
+        """Yield the offset and character of every brace outside strings and comments.
 
-        for i in range(start_line, len(lines)):
-            line = lines[i]
-            for char in line:
-                if char == '{':
-                    brace_count += 1
-                    in_block = True
-                elif char == '}':
-                    brace_count -= 1
-                    if in_block and brace_count == 0:
-                        return i + 1
+        Template literal text is skipped too, while the braces of code inside its
+        ${...} substitutions are kept. A quote without a closing quote on the same
+        line is ignored rather than hiding the braces after it.
+        """
+        # Number of braces opened inside each enclosing ${...} substitution
+        substitution_depths = []
+        in_template = False
+        pos = 0
+        while pos < len(content):
+            if in_template:
+                pos = _TEMPLATE_TEXT_RE.match(content, pos).end()
+                if content.startswith('${', pos):
+                    substitution_depths.append(0)
+                    pos += 2
+                elif pos < len(content):
+                    pos += 1
+                in_template = False
+                continue
 
-        return len(lines)
+            match = _BRACE_TOKEN_RE.search(content, pos)
+            if match is None:
+                return
+            pos = match.end()
+            token = match.group()
+            if token == '`':
+                in_template = True
+            elif token == '{':
+                if substitution_depths:
+                    substitution_depths[-1] += 1
+                yield match.start(), token
+            elif token == '}':
+                if substitution_depths and substitution_depths[-1] == 0:
+                    # End of a substitution, back to the template literal text
+                    substitution_depths.pop()
+                    in_template = True
+                    continue
+                if substitution_depths:
+                    substitution_depths[-1] -= 1
+                yield match.start(), token
 
     def _extract_jsdoc(self, lines: List[str], func_line: int) -> str:
         """Extract JSDoc comment before a function."""
@@ -237,16 +317,12 @@ class JavaScriptParser(BaseParser):
             return None
 
         # Look backwards for JSDoc comment
-        doc_lines = []
         for i in range(func_line - 1, max(func_line - 20, -1), -1):
             line = lines[i].strip()
             if line.startswith('*/'):
-                doc_lines.insert(0, line)
                 for j in range(i - 1, max(func_line - 20, -1), -1):
-                    doc_line = lines[j].strip()
-                    doc_lines.insert(0, doc_line)
-                    if doc_line.startswith('/**'):
-                        return '\n'.join(doc_lines)
+                    if lines[j].lstrip().startswith('/**'):
+                        return '\n'.join(doc_line.strip() for doc_line in lines[j:i + 1])
                 break
             elif not line or line.startswith('//'):
                 continue
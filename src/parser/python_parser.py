@@ -1,12 +1,16 @@
 """Python code parser using AST."""
 
 import ast
-from typing import List
+from itertools import islice
+from typing import List, Union
 from pathlib import Path
 
+from src.config import settings
 from src.models.code_unit import CodeUnit, CodeUnitType
 from src.parser.base_parser import BaseParser
+from src.parser.statement_extractor import StatementExtractor
 from src.utils.logger import setup_logger
+from src.utils.metadata_extractor import MetadataExtractor
 
 logger = setup_logger("parser.python")
 
@@ -18,59 +22,43 @@ class PythonParser(BaseParser):
         """Get supported file extensions."""
         return ['.py', '.pyw']
 
-    def parse_file(self, file_path: str) -> List[CodeUnit]:
-        """Parse a Python file and extract code units.
+    def parse_source(self, source_code: str, file_path: str) -> List[CodeUnit]:
+        """Parse Python source code and extract code units.
 
         Args:
+            source_code: Python source code
             file_path: Path to the Python file
 
         Returns:
             List of extracted code units
         """
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                source_code = f.read()
-
             tree = ast.parse(source_code)
+            lines = source_code.split("\n")
             code_units = []
-
-            for node in ast.walk(tree):
-                if isinstance(node, ast.FunctionDef):
-                    code_units.append(self._extract_function(node, file_path, source_code))
-                elif isinstance(node, ast.ClassDef):
-                    code_units.append(self._extract_class(node, file_path, source_code))
+            self._collect_definitions(tree, file_path, lines, False, code_units)
 
             # Extract statements if enabled
-            from src.config import settings
             if settings.enable_statement_chunking:
-                from src.parser.statement_extractor import StatementExtractor
                 statements = StatementExtractor.extract_python_statements(
-                    source_code, file_path
+                    source_code, file_path, tree=tree
                 )
-                code_units.extend(statements[:settings.max_statements_per_function])
+                code_units.extend(islice(statements, settings.max_statements_per_function))
             
             # Detect concepts for all code units
-            from src.models.code_concepts import ConceptDetector
-            from src.utils.metadata_extractor import MetadataExtractor
-            
+            self._annotate_concepts(source_code, code_units, 'python')
+
             # Extract file-level imports
-            file_imports = MetadataExtractor.extract_python_imports(source_code)
+            file_imports = MetadataExtractor.extract_python_imports(source_code, tree)
+            
+            imports = ','.join(file_imports[:10])  # Limit to 10
             
             for unit in code_units:
-                concepts = ConceptDetector.detect_concepts(unit.content, 'python')
-                if concepts:
-                    if unit.metadata is None:
-                        unit.metadata = {}
-                    unit.metadata['concepts'] = ','.join([c.value for c in concepts])
-                
                 # Add rich metadata
-                if unit.metadata is None:
-                    unit.metadata = {}
-                
-                unit.metadata['imports'] = ','.join(file_imports[:10])  # Limit to 10
-                unit.metadata['complexity'] = MetadataExtractor.calculate_complexity(unit.content)
-                unit.metadata['has_docs'] = MetadataExtractor.has_docstring(unit.content, 'python')
-                unit.metadata['param_count'] = len(MetadataExtractor.extract_parameters(unit.signature or '', 'python'))
+                unit.metadata['imports'] = imports
+                unit.metadata.update(
+                    MetadataExtractor.extract_all(unit.content, unit.signature, 'python')
+                )
 
             logger.info(f"Parsed {len(code_units)} code units from {file_path}")
             return code_units
@@ -79,21 +67,55 @@ class PythonParser(BaseParser):
             logger.error(f"Error parsing file {file_path}: {e}")
             return []
 
+    def _collect_definitions(
+        self,
+        node: ast.AST,
+        file_path: str,
+        lines: List[str],
+        in_class: bool,
+        code_units: List[CodeUnit],
+    ) -> None:
+        """Extract the classes and functions nested in a node, in source order.
+
+        Only statements are descended into, since definitions never occur
+        inside expressions.
+
+        Args:
+            node: AST node whose children are visited
+            file_path: Path to source file
+            lines: Lines of the full source code
+            in_class: Whether node is a class body, making its functions methods
+            code_units: List the extracted code units are appended to
+        """
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, ast.ClassDef):
+                code_units.append(self._extract_class(child, file_path, lines))
+                self._collect_definitions(child, file_path, lines, True, code_units)
+            elif isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                code_units.append(self._extract_function(child, file_path, lines, in_class))
+                self._collect_definitions(child, file_path, lines, False, code_units)
+            elif not isinstance(child, ast.expr):
+                self._collect_definitions(child, file_path, lines, in_class, code_units)
+
     def _extract_function(
-        self, node: ast.FunctionDef, file_path: str, source_code: str
+        self,
+        node: Union[ast.FunctionDef, ast.AsyncFunctionDef],
+        file_path: str,
+        lines: List[str],
+        is_method: bool,
     ) -> CodeUnit:
         """Extract function as a code unit.
 
         Args:
             node: AST function node
             file_path: Path to source file
-            source_code: Full source code
+            lines: Lines of the full source code
+            is_method: Whether the function is defined in a class body
 
         Returns:
             CodeUnit representing the function
         """
         # Get function source code
-        lines = source_code.split("\n")
         start_line = node.lineno
         end_line = node.end_lineno or start_line
         content = "\n".join(lines[start_line - 1 : end_line])
@@ -103,10 +125,10 @@ class PythonParser(BaseParser):
 
         # Build signature
         args = [arg.arg for arg in node.args.args]
-        signature = f"def {node.name}({', '.join(args)})"
+        prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+        signature = f"{prefix} {node.name}({', '.join(args)})"
 
-        # Determine if it's a method (inside a class)
-        unit_type = CodeUnitType.METHOD if self._is_method(node) else CodeUnitType.FUNCTION
+        unit_type = CodeUnitType.METHOD if is_method else CodeUnitType.FUNCTION
 
         return CodeUnit(
             type=unit_type,
@@ -121,19 +143,18 @@ class PythonParser(BaseParser):
             metadata={"args": args, "decorators": [d.id for d in node.decorator_list if isinstance(d, ast.Name)]},
         )
 
-    def _extract_class(self, node: ast.ClassDef, file_path: str, source_code: str) -> CodeUnit:
+    def _extract_class(self, node: ast.ClassDef, file_path: str, lines: List[str]) -> CodeUnit:
         """Extract class as a code unit.
 
         Args:
             node: AST class node
             file_path: Path to source file
-            source_code: Full source code
+            lines: Lines of the full source code
 
         Returns:
             CodeUnit representing the class
         """
         # Get class source code
-        lines = source_code.split("\n")
         start_line = node.lineno
         end_line = node.end_lineno or start_line
         content = "\n".join(lines[start_line - 1 : end_line])
@@ -145,7 +166,9 @@ class PythonParser(BaseParser):
         bases = [base.id for base in node.bases if isinstance(base, ast.Name)]
 
         # Get method names
-        methods = [m.name for m in node.body if isinstance(m, ast.FunctionDef)]
+        methods = [
+            m.name for m in node.body if isinstance(m, (ast.FunctionDef, ast.AsyncFunctionDef))
+        ]
 
         return CodeUnit(
             type=CodeUnitType.CLASS,
@@ -159,18 +182,3 @@ class PythonParser(BaseParser):
             signature=f"class {node.name}",
             metadata={"bases": bases, "methods": methods},
         )
-
-    def _is_method(self, node: ast.FunctionDef) -> bool:
-        """Check if a function node is a method (inside a class).
-
-        Args:
-            node: AST function node
-
-        Returns:
-            True if the function is a method
-        """
-        # Check if the function has 'self' or 'cls' as first argument
-        if node.args.args:
-            first_arg = node.args.args[0].arg
-            return first_arg in ("self", "cls")
-        return False
@@ -2,45 +2,128 @@
 
 import ast
 import re
-from typing import List, Dict, Any
+from collections import deque
+from typing import Any, Callable, Dict, Iterator, List, Match, Optional, Pattern
 from src.models.code_unit import CodeUnit, CodeUnitType
 from src.utils.logger import setup_logger
 
 logger = setup_logger("statement_extractor")
 
+# Python nodes that cannot contain a statement worth extracting, so they are not traversed
+_PYTHON_LEAF_NODE_TYPES = (
+    ast.Name, ast.Constant, ast.expr_context, ast.operator, ast.boolop, ast.unaryop, ast.cmpop
+)
+
+# Keywords marking the assignments and calls worth extracting
+_OPERATION_KEYWORDS = ('append', 'extend', 'update', 'pop')
+_CALL_KEYWORDS = ('print', 'log', 'raise', 'assert')
+
+# The statement patterns below never match across a newline, so that scanning
+# the whole source finds the same matches as searching it line by line.
+
+# Pattern for variable swapping: [a, b] = [b, a+b]
+_SWAP_RE = re.compile(r'\[([^\]\n]+)\][^\S\n]*=[^\S\n]*\[([^\]\n]+)\]')
+
+# Patterns for loops and conditionals in C-style syntax (JavaScript, Java)
+_FOR_RE = re.compile(r'for[^\S\n]*\(([^)\n]+)\)')
+_WHILE_RE = re.compile(r'while[^\S\n]*\(([^)\n]+)\)')
+_IF_RE = re.compile(r'if[^\S\n]*\(([^)\n]+)\)')
+
+# Go loops have no parentheses
+_GO_FOR_RE = re.compile(r'for[^\S\n]+([^{\n]+)\{')
+
+
+def _first_match_per_line(pattern: Pattern[str], code: str) -> Dict[int, Match[str]]:
+    """Find the first match of a single-line pattern on every line.
+
+    Gives the same matches as calling pattern.search on each line, with one
+    scan of the whole source instead of a Python-level call per line.
+
+    Args:
+        pattern: Compiled pattern that cannot match a newline
+        code: Source code
+
+    Returns:
+        First match on each line, keyed by 1-based line number
+    """
+    matches: Dict[int, Match[str]] = {}
+    line = 1
+    offset = 0
+    for match in pattern.finditer(code):
+        line += code.count('\n', offset, match.start())
+        offset = match.start()
+        matches.setdefault(line, match)
+    return matches
+
+
+def _line_of(code: str, match: Match[str]) -> str:
+    """Get the source line containing a single-line match, without splitting the source."""
+    start = code.rfind('\n', 0, match.start()) + 1
+    end = code.find('\n', match.end())
+    return code[start:] if end == -1 else code[start:end]
+
 
 class StatementExtractor:
     """Extract individual statements from code for fine-grained search."""
     
     @staticmethod
-    def extract_python_statements(code: str, file_path: str, parent_name: str = None) -> List[CodeUnit]:
+    def extract_python_statements(
+        code: str, file_path: str, parent_name: str = None, tree: Optional[ast.AST] = None
+    ) -> Iterator[CodeUnit]:
         """Extract statements from Python code.
         
+        Statements are generated lazily, so a caller that only needs the first
+        few does not pay for analyzing the rest of the file.
+        
         Args:
             code: Python source code
             file_path: Path to source file
             parent_name: Name of parent function/class
+            tree: AST of code, if the caller already parsed it
             
-        Returns:
-            List of statement-level code units
+        Yields:
+            Statement-level code units
         """
-        statements = []
-        
         try:
-            tree = ast.parse(code)
+            if tree is None:
+                tree = ast.parse(code)
             lines = code.split('\n')
+
+            # Assignment and return values are often calls that are visited again
+            unparsed: Dict[int, str] = {}
+
+            def unparse(node: ast.AST) -> str:
+                text = unparsed.get(id(node))
+                if text is None:
+                    text = unparsed[id(node)] = ast.unparse(node)
+                return text
             
-            for node in ast.walk(tree):
+            # Breadth-first like ast.walk, which sets the order of the statements,
+            # but without visiting leaf nodes or analyzing uninteresting ones
+            todo = deque([tree])
+            while todo:
+                node = todo.popleft()
+                todo.extend(
+                    child for child in ast.iter_child_nodes(node)
+                    if not isinstance(child, _PYTHON_LEAF_NODE_TYPES)
+                )
+                analyze = _PYTHON_NODE_ANALYZERS.get(type(node))
+                if analyze is None:
+                    continue
+
                 # Extract interesting statements
-                statement_info = StatementExtractor._analyze_node(node, lines)
+                statement_info = analyze(node, unparse)
                 
                 if statement_info:
                     stmt_type, description, start_line, end_line = statement_info
                     
-                    # Get the actual code
-                    stmt_code = '\n'.join(lines[start_line-1:end_line])
+                    # Get the actual code; most statements are a single line
+                    if start_line == end_line:
+                        stmt_code = lines[start_line - 1]
+                    else:
+                        stmt_code = '\n'.join(lines[start_line-1:end_line])
                     
-                    statements.append(CodeUnit(
+                    yield CodeUnit(
                         type=CodeUnitType.STATEMENT,
                         name=f"{stmt_type}: {description}",
                         content=stmt_code,
@@ -54,65 +137,79 @@ class StatementExtractor:
                             'parent': parent_name,
                             'description': description
                         }
-                    ))
+                    )
         
         except Exception as e:
             logger.error(f"Error extracting statements: {e}")
-        
-        return statements
     
     @staticmethod
-    def _analyze_node(node: ast.AST, lines: List[str]) -> tuple:
+    def _analyze_node(node: ast.AST, unparse: Callable[[ast.AST], str]) -> tuple:
         """Analyze AST node and extract statement info.
         
+        Args:
+            node: AST node
+            unparse: ast.unparse, memoized per extraction
+            
         Returns:
             (type, description, start_line, end_line) or None
         """
-        # For loops
-        if isinstance(node, ast.For):
-            target = ast.unparse(node.target) if hasattr(ast, 'unparse') else 'item'
-            iter_expr = ast.unparse(node.iter) if hasattr(ast, 'unparse') else 'iterable'
-            return ('loop', f'for {target} in {iter_expr}', node.lineno, node.end_lineno or node.lineno)
-        
-        # While loops
-        elif isinstance(node, ast.While):
-            condition = ast.unparse(node.test) if hasattr(ast, 'unparse') else 'condition'
-            return ('loop', f'while {condition}', node.lineno, node.end_lineno or node.lineno)
-        
-        # If statements
-        elif isinstance(node, ast.If):
-            condition = ast.unparse(node.test) if hasattr(ast, 'unparse') else 'condition'
-            return ('conditional', f'if {condition}', node.lineno, node.lineno)
-        
-        # Assignments (especially interesting ones)
-        elif isinstance(node, ast.Assign):
-            # Get target and value
-            if hasattr(ast, 'unparse'):
-                targets = ', '.join(ast.unparse(t) for t in node.targets)
-                value = ast.unparse(node.value)
-                
-                # Check for tuple unpacking (like a, b = b, a+b)
-                if isinstance(node.value, ast.Tuple) and isinstance(node.targets[0], ast.Tuple):
-                    return ('assignment', f'{targets} = {value}', node.lineno, node.lineno)
-                
-                # Check for list/dict operations
-                if any(keyword in value.lower() for keyword in ['append', 'extend', 'update', 'pop']):
-                    return ('operation', f'{targets} = {value}', node.lineno, node.lineno)
-        
-        # Return statements
-        elif isinstance(node, ast.Return):
-            if node.value and hasattr(ast, 'unparse'):
-                value = ast.unparse(node.value)
-                return ('return', f'return {value}', node.lineno, node.lineno)
+        analyze = _PYTHON_NODE_ANALYZERS.get(type(node))
+        return analyze(node, unparse) if analyze else None
+    
+    @staticmethod
+    def _analyze_for(node: ast.For, unparse: Callable[[ast.AST], str]) -> tuple:
+        """Extract a for loop."""
+        target = unparse(node.target)
+        iter_expr = unparse(node.iter)
+        return ('loop', f'for {target} in {iter_expr}', node.lineno, node.end_lineno or node.lineno)
+    
+    @staticmethod
+    def _analyze_while(node: ast.While, unparse: Callable[[ast.AST], str]) -> tuple:
+        """Extract a while loop."""
+        condition = unparse(node.test)
+        return ('loop', f'while {condition}', node.lineno, node.end_lineno or node.lineno)
+    
+    @staticmethod
+    def _analyze_if(node: ast.If, unparse: Callable[[ast.AST], str]) -> tuple:
+        """Extract an if statement."""
+        condition = unparse(node.test)
+        return ('conditional', f'if {condition}', node.lineno, node.lineno)
+    
+    @staticmethod
+    def _analyze_assign(node: ast.Assign, unparse: Callable[[ast.AST], str]) -> tuple:
+        """Extract an assignment, if it is especially interesting."""
+        # Get value
+        value = unparse(node.value)
         
-        # Function calls (important ones)
-        elif isinstance(node, ast.Call):
-            if hasattr(ast, 'unparse'):
-                call_str = ast.unparse(node)
-                # Only track certain function calls
-                if any(keyword in call_str.lower() for keyword in ['print', 'log', 'raise', 'assert']):
-                    return ('call', call_str, node.lineno, node.lineno)
+        # Check for tuple unpacking (like a, b = b, a+b)
+        if isinstance(node.value, ast.Tuple) and isinstance(node.targets[0], ast.Tuple):
+            stmt_type = 'assignment'
+        # Check for list/dict operations
+        else:
+            value_lower = value.lower()
+            if not any(keyword in value_lower for keyword in _OPERATION_KEYWORDS):
+                return None
+            stmt_type = 'operation'
         
+        targets = ', '.join(unparse(t) for t in node.targets)
+        return (stmt_type, f'{targets} = {value}', node.lineno, node.lineno)
+    
+    @staticmethod
+    def _analyze_return(node: ast.Return, unparse: Callable[[ast.AST], str]) -> tuple:
+        """Extract a return statement with a value."""
+        if not node.value:
+            return None
+        value = unparse(node.value)
+        return ('return', f'return {value}', node.lineno, node.lineno)
+    
+    @staticmethod
+    def _analyze_call(node: ast.Call, unparse: Callable[[ast.AST], str]) -> tuple:
+        """Extract a function call, if it is an important one."""
+        call_str = unparse(node)
+        call_lower = call_str.lower()
+        # Only track certain function calls
+        if any(keyword in call_lower for keyword in _CALL_KEYWORDS):
+            return ('call', call_str, node.lineno, node.lineno)
         return None
     
     @staticmethod
@@ -128,23 +225,20 @@ class StatementExtractor:
             List of statement-level code units
         """
         statements = []
-        lines = code.split('\n')
-        
-        # Pattern for variable swapping: [a, b] = [b, a+b]
-        swap_pattern = r'\[([^\]]+)\]\s*=\s*\[([^\]]+)\]'
-        
-        # Pattern for loops
-        for_pattern = r'for\s*\(([^)]+)\)'
-        while_pattern = r'while\s*\(([^)]+)\)'
-        
-        # Pattern for conditionals
-        if_pattern = r'if\s*\(([^)]+)\)'
+        swaps = _first_match_per_line(_SWAP_RE, code)
+        for_loops = _first_match_per_line(_FOR_RE, code)
+        while_loops = _first_match_per_line(_WHILE_RE, code)
+        conditionals = _first_match_per_line(_IF_RE, code)
         
-        for i, line in enumerate(lines, 1):
-            line_stripped = line.strip()
+        # Each line yields at most one statement, by order of precedence below
+        for i in sorted(swaps.keys() | for_loops.keys() | while_loops.keys() | conditionals.keys()):
+            line_match = (
+                swaps.get(i) or for_loops.get(i) or while_loops.get(i) or conditionals.get(i)
+            )
+            line_stripped = _line_of(code, line_match).strip()
             
             # Destructuring assignment / swap
-            if match := re.search(swap_pattern, line):
+            if match := swaps.get(i):
                 statements.append(CodeUnit(
                     type=CodeUnitType.STATEMENT,
                     name=f"assignment: {match.group(0)}",
@@ -162,7 +256,7 @@ class StatementExtractor:
                 ))
             
             # For loops
-            elif match := re.search(for_pattern, line):
+            elif match := for_loops.get(i):
                 statements.append(CodeUnit(
                     type=CodeUnitType.STATEMENT,
                     name=f"loop: for {match.group(1)}",
@@ -179,7 +273,7 @@ class StatementExtractor:
                 ))
             
             # While loops
-            elif match := re.search(while_pattern, line):
+            elif match := while_loops.get(i):
                 statements.append(CodeUnit(
                     type=CodeUnitType.STATEMENT,
                     name=f"loop: while {match.group(1)}",
@@ -196,7 +290,7 @@ class StatementExtractor:
                 ))
             
             # If statements
-            elif match := re.search(if_pattern, line):
+            elif match := conditionals.get(i):
                 statements.append(CodeUnit(
                     type=CodeUnitType.STATEMENT,
                     name=f"conditional: if {match.group(1)}",
@@ -218,27 +312,21 @@ class StatementExtractor:
     def extract_java_statements(code: str, file_path: str, parent_name: str = None) -> List[CodeUnit]:
         """Extract statements from Java code."""
         statements = []
-        lines = code.split('\n')
         
-        for_pattern = r'for\s*\(([^)]+)\)'
-        while_pattern = r'while\s*\(([^)]+)\)'
-        if_pattern = r'if\s*\(([^)]+)\)'
-        
-        for i, line in enumerate(lines, 1):
-            line_stripped = line.strip()
+        for i, match in _first_match_per_line(_FOR_RE, code).items():
+            line_stripped = _line_of(code, match).strip()
             
-            if match := re.search(for_pattern, line):
-                statements.append(CodeUnit(
-                    type=CodeUnitType.STATEMENT,
-                    name=f"loop: for {match.group(1)}",
-                    content=line_stripped,
-                    file_path=file_path,
-                    start_line=i,
-                    end_line=i,
-                    language='java',
-                    signature=f"for ({match.group(1)})",
-                    metadata={'statement_type': 'loop', 'parent': parent_name}
-                ))
+            statements.append(CodeUnit(
+                type=CodeUnitType.STATEMENT,
+                name=f"loop: for {match.group(1)}",
+                content=line_stripped,
+                file_path=file_path,
+                start_line=i,
+                end_line=i,
+                language='java',
+                signature=f"for ({match.group(1)})",
+                metadata={'statement_type': 'loop', 'parent': parent_name}
+            ))
         
         return statements
     
@@ -246,26 +334,32 @@ class StatementExtractor:
     def extract_go_statements(code: str, file_path: str, parent_name: str = None) -> List[CodeUnit]:
         """Extract statements from Go code."""
         statements = []
-        lines = code.split('\n')
         
-        for_pattern = r'for\s+([^{]+)\s*\{'
-        if_pattern = r'if\s+([^{]+)\s*\{'
-        var_pattern = r'(\w+)\s*:=\s*([^/\n]+)'
-        
-        for i, line in enumerate(lines, 1):
-            line_stripped = line.strip()
+        for i, match in _first_match_per_line(_GO_FOR_RE, code).items():
+            line_stripped = _line_of(code, match).strip()
             
-            if match := re.search(for_pattern, line):
-                statements.append(CodeUnit(
-                    type=CodeUnitType.STATEMENT,
-                    name=f"loop: for {match.group(1).strip()}",
-                    content=line_stripped,
-                    file_path=file_path,
-                    start_line=i,
-                    end_line=i,
-                    language='go',
-                    signature=f"for {match.group(1).strip()}",
-                    metadata={'statement_type': 'loop', 'parent': parent_name}
-                ))
+            statements.append(CodeUnit(
+                type=CodeUnitType.STATEMENT,
+                name=f"loop: for {match.group(1).strip()}",
+                content=line_stripped,
+                file_path=file_path,
+                start_line=i,
+                end_line=i,
+                language='go',
+                signature=f"for {match.group(1).strip()}",
+                metadata={'statement_type': 'loop', 'parent': parent_name}
+            ))
         
         return statements
+
+
+# Analyzer of each Python node type with extractable statements, dispatched on
+# the exact type instead of a chain of isinstance checks
+_PYTHON_NODE_ANALYZERS: Dict[type, Callable[[Any, Callable[[ast.AST], str]], tuple]] = {
+    ast.For: StatementExtractor._analyze_for,
+    ast.While: StatementExtractor._analyze_while,
+    ast.If: StatementExtractor._analyze_if,
+    ast.Assign: StatementExtractor._analyze_assign,
+    ast.Return: StatementExtractor._analyze_return,
+    ast.Call: StatementExtractor._analyze_call,
+}
@@ -1,8 +1,14 @@
 """Concept-based scoring for cross-language code similarity."""
 
-from typing import List
+from typing import FrozenSet, List
+
+import numpy as np
+
 from src.models.code_concepts import CodeConcept
 
+# Stored values of all concepts, for skipping unknown values
+_CONCEPT_VALUES = frozenset(concept.value for concept in CodeConcept)
+
 
 class ConceptScorer:
     """Score code similarity based on programming concepts."""
@@ -21,29 +27,36 @@ class ConceptScorer:
         Returns:
             Score between 0.0 and 1.0
         """
-        if not query_concepts or not result_concepts:
-            return 0.0
+        return ConceptScorer.calculate_concept_value_score(
+            frozenset(concept.value for concept in query_concepts), result_concepts
+        )
+    
+    @staticmethod
+    def calculate_concept_value_score(query_values: FrozenSet[str], result_concepts: str) -> float:
+        """Calculate concept similarity score from the values of the query's concepts.
         
-        # Parse comma-separated string to list
-        result_concept_list = [c.strip() for c in result_concepts.split(",") if c.strip()]
+        Lets a caller scoring many results convert the query concepts once.
+        
+        Args:
+            query_values: Values of the concepts detected from query
+            result_concepts: Concepts from code result (comma-separated string)
+            
+        Returns:
+            Score between 0.0 and 1.0
+        """
+        if not query_values or not result_concepts:
+            return 0.0
         
-        # Convert result concepts to CodeConcept enum
-        result_concept_enums = []
-        for concept_str in result_concept_list:
-            try:
-                result_concept_enums.append(CodeConcept(concept_str))
-            except ValueError:
-                continue
+        # Parse the comma-separated string into known concept values; comparing
+        # values avoids constructing CodeConcept members from strings
+        result_set = {c.strip() for c in result_concepts.split(",")} & _CONCEPT_VALUES
         
-        if not result_concept_enums:
+        if not result_set:
             return 0.0
         
         # Calculate Jaccard similarity (intersection / union)
-        query_set = set(query_concepts)
-        result_set = set(result_concept_enums)
-        
-        intersection = len(query_set & result_set)
-        union = len(query_set | result_set)
+        intersection = len(query_values & result_set)
+        union = len(query_values | result_set)
         
         return intersection / union if union > 0 else 0.0
     
@@ -86,3 +99,39 @@ class ConceptScorer:
         )
         
         return min(final_score, 1.0)  # Cap at 1.0
+    
+    @staticmethod
+    def boost_scores(
+        semantic_scores: np.ndarray,
+        concept_scores: np.ndarray,
+        has_docstring: np.ndarray,
+        semantic_weight: float = 0.60,
+        concept_weight: float = 0.25,
+        quality_weight: float = 0.10,
+        recency_weight: float = 0.05
+    ) -> np.ndarray:
+        """Calculate final scores of many results at once, as boost_score_with_concepts.
+        
+        Args:
+            semantic_scores: Embedding similarities (0-1)
+            concept_scores: Concept match scores (0-1)
+            has_docstring: Whether each result has documentation
+            semantic_weight: Weight for semantic similarity
+            concept_weight: Weight for concept matching
+            quality_weight: Weight for code quality
+            recency_weight: Weight for recency
+            
+        Returns:
+            Array of final boosted scores (0-1)
+        """
+        quality_scores = np.where(has_docstring, 1.0, 0.5)
+        recency_score = 0.5
+        
+        final_scores = (
+            semantic_scores * semantic_weight +
+            concept_scores * concept_weight +
+            quality_scores * quality_weight +
+            recency_score * recency_weight
+        )
+        
+        return np.minimum(final_scores, 1.0)  # Cap at 1.0
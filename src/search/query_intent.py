@@ -7,8 +7,8 @@ import re
 class QueryIntent:
     """Detect user intent from search queries."""
     
-    # Intent patterns
-    INTENTS = {
+    # Intent patterns, each intent's alternatives compiled into one regex at import
+    INTENTS = {intent: re.compile('|'.join(f'(?:{p})' for p in patterns)) for intent, patterns in {
         'list_all_classes': [
             r'(list|show|what are|find)\s+(all\s+)?(the\s+)?classes',
             r'responsibility\s+of\s+each\s+class',
@@ -28,7 +28,7 @@ class QueryIntent:
             r'asynchronous',
             r'await',
         ],
-    }
+    }.items()}
     
     @staticmethod
     def detect_intent(query: str) -> Dict[str, Any]:
@@ -49,20 +49,18 @@ class QueryIntent:
         }
         
         # Check for list all classes intent
-        for pattern in QueryIntent.INTENTS['list_all_classes']:
-            if re.search(pattern, query_lower):
-                detected_intent['type'] = 'list_all_classes'
-                detected_intent['filter_type'] = 'class'
-                detected_intent['expand_limit'] = True
-                return detected_intent
+        if QueryIntent.INTENTS['list_all_classes'].search(query_lower):
+            detected_intent['type'] = 'list_all_classes'
+            detected_intent['filter_type'] = 'class'
+            detected_intent['expand_limit'] = True
+            return detected_intent
         
         # Check for list all functions intent
-        for pattern in QueryIntent.INTENTS['list_all_functions']:
-            if re.search(pattern, query_lower):
-                detected_intent['type'] = 'list_all_functions'
-                detected_intent['filter_type'] = 'function'
-                detected_intent['expand_limit'] = True
-                return detected_intent
+        if QueryIntent.INTENTS['list_all_functions'].search(query_lower):
+            detected_intent['type'] = 'list_all_functions'
+            detected_intent['filter_type'] = 'function'
+            detected_intent['expand_limit'] = True
+            return detected_intent
         
         return detected_intent
     
@@ -1,7 +1,8 @@
 """Post-retrieval aggregation for search results."""
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 from collections import defaultdict
+from itertools import islice
 
 
 class ResultAggregator:
@@ -21,12 +22,17 @@ class ResultAggregator:
         if not results:
             return []
         
-        # First, deduplicate exact duplicates
-        deduplicated = ResultAggregator._deduplicate(results)
-        
-        # Group by file for context enrichment only
+        # Deduplicate exact duplicates and group by file (for context enrichment
+        # only) in one pass
+        deduplicated = []
+        seen_signatures = set()
         file_groups = defaultdict(list)
-        for result in deduplicated:
+        for result in results:
+            signature = ResultAggregator._signature(result)
+            if signature in seen_signatures:
+                continue
+            seen_signatures.add(signature)
+            deduplicated.append(result)
             file_path = result.get("metadata", {}).get("file_path", "unknown")
             file_groups[file_path].append(result)
         
@@ -35,16 +41,12 @@ class ResultAggregator:
             # Sort by score within file
             file_results.sort(key=lambda x: x.get("final_score", 0), reverse=True)
             
+            names = [r.get("metadata", {}).get("name", "") for r in file_results]
+            
             # For each result, find related items
-            for i, result in enumerate(file_results):
-                # Find related items (same file, different name)
-                related = []
-                result_name = result.get("metadata", {}).get("name", "")
-                
-                for other in file_results:
-                    other_name = other.get("metadata", {}).get("name", "")
-                    if other_name != result_name and len(related) < 3:
-                        related.append(other_name)
+            for result, result_name in zip(file_results, names):
+                # Find the first related items (same file, different name), stopping at 3
+                related = list(islice((name for name in names if name != result_name), 3))
                 
                 if related:
                     result["related_methods"] = related
@@ -55,7 +57,9 @@ class ResultAggregator:
         return deduplicated[:max_results]
     
     @staticmethod
-    def _group_by_class(results: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    def _group_by_class(
+        results: List[Dict[str, Any]]
+    ) -> Dict[Tuple[str, str], List[Dict[str, Any]]]:
         """Group results by class name."""
         class_groups = defaultdict(list)
         
@@ -67,11 +71,11 @@ class ResultAggregator:
             # For methods, try to extract class name from signature or name
             if code_type == "method":
                 # Use file path + type as grouping key for methods
-                class_key = f"{metadata.get('file_path', '')}:methods"
+                class_key = ("methods", metadata.get("file_path", ""))
             elif code_type == "class":
-                class_key = f"class:{name}"
+                class_key = ("class", name)
             else:
-                class_key = f"standalone:{name}"
+                class_key = ("standalone", name)
             
             class_groups[class_key].append(result)
         
@@ -87,22 +91,26 @@ class ResultAggregator:
         seen_signatures = set()
         
         for result in results:
-            metadata = result.get("metadata", {})
-            
-            # Create signature for deduplication based on CONTENT, not file path
-            # identifying name, type, and actual code content
-            signature = (
-                metadata.get("name", ""),
-                metadata.get("type", ""),
-                result.get("document", "").strip()  # Use content itself for dedup
-            )
-            
+            signature = ResultAggregator._signature(result)
             if signature not in seen_signatures:
                 seen_signatures.add(signature)
                 deduplicated.append(result)
         
         return deduplicated
     
+    @staticmethod
+    def _signature(result: Dict[str, Any]) -> Tuple[str, str, str]:
+        """Get the deduplication signature of a result."""
+        metadata = result.get("metadata", {})
+        
+        # Create signature for deduplication based on CONTENT, not file path
+        # identifying name, type, and actual code content
+        return (
+            metadata.get("name", ""),
+            metadata.get("type", ""),
+            result.get("document", "").strip()  # Use content itself for dedup
+        )
+    
     @staticmethod
     def merge_context(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Merge results from the same context (file/class) to show full picture.
@@ -122,7 +130,7 @@ class ResultAggregator:
             start_line = metadata.get("start_line", 0)
             
             # Group results within 50 lines of each other
-            context_key = f"{file_path}:{start_line // 50}"
+            context_key = (file_path, start_line // 50)
             context_groups[context_key].append(result)
         
         merged = []
@@ -1,11 +1,15 @@
 """Semantic search engine."""
 
+import asyncio
 from typing import List, Dict, Any, Optional
 
-from src.embeddings.embedding_service import EmbeddingService
+import numpy as np
+
+from src.embeddings.embedding_service import get_embedding_service
 from src.embeddings.vector_store import VectorStore
 from src.config import settings
 from src.utils.logger import setup_logger
+from src.utils.similarity import similarity_scores
 
 from src.generation.generation_service import GenerationService
 from src.search.query_intent import QueryIntent
@@ -22,7 +26,7 @@ class SemanticSearch:
 
     def __init__(self):
         """Initialize the search engine."""
-        self.embedding_service = EmbeddingService()
+        self.embedding_service = get_embedding_service()
         self.vector_store = VectorStore()
         self.result_aggregator = ResultAggregator()
         self.generation_service = GenerationService()
@@ -56,10 +60,69 @@ class SemanticSearch:
         if limit is None:
             limit = settings.default_search_limit
 
-        logger.info(f"Searching for: '{query}' (limit={limit})")
-        
+        logger.info("Searching for: '%s' (limit=%d)", query, limit)
+
+        # Generate query embedding
+        query_embedding = self.embedding_service.generate_query_embedding(query)
+
+        return self._search_with_embedding(query, query_embedding, limit, file_filter, type_filter)
+
+    async def asearch(
+        self,
+        query: str,
+        limit: int = None,
+        file_filter: Optional[str] = None,
+        type_filter: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Async variant of search.
+
+        The query embedding is requested together with those of concurrent
+        searches, and the blocking vector store query runs in a worker thread.
+
+        Args:
+            query: Natural language search query
+            limit: Maximum number of results (default from settings)
+            file_filter: Optional filter by file path
+            type_filter: Optional filter by code unit type
+
+        Returns:
+            List of search results
+        """
+        if not query:
+            raise ValueError("Query cannot be empty")
+
+        if limit is None:
+            limit = settings.default_search_limit
+
+        logger.info("Searching for: '%s' (limit=%d)", query, limit)
+
+        query_embedding = await self.embedding_service.agenerate_query_embedding(query)
+
+        return await asyncio.to_thread(
+            self._search_with_embedding, query, query_embedding, limit, file_filter, type_filter
+        )
+
+    def _search_with_embedding(
+        self,
+        query: str,
+        query_embedding: np.ndarray,
+        limit: int,
+        file_filter: Optional[str],
+        type_filter: Optional[str],
+    ) -> List[Dict[str, Any]]:
+        """Search the vector store for a query whose embedding is already known.
+
+        Args:
+            query: Natural language search query
+            query_embedding: Embedding of the query
+            limit: Maximum number of results
+            file_filter: Optional filter by file path
+            type_filter: Optional filter by code unit type
+
+        Returns:
+            List of search results
+        """
         # Detect query intent and adjust parameters
-        from src.search.query_intent import QueryIntent
         search_params = QueryIntent.adjust_search_params(query, default_limit=limit)
         
         # Use adjusted limit and filters
@@ -76,9 +139,6 @@ class SemanticSearch:
         if search_params.get('filter_dict'):
             filter_dict.update(search_params['filter_dict'])
 
-        # Generate query embedding
-        query_embedding = self.embedding_service.generate_query_embedding(query)
-
         # Search vector store with adjusted parameters
         results = self.vector_store.search(
             query_embedding=query_embedding,
@@ -87,53 +147,53 @@ class SemanticSearch:
         )
 
         # Detect concepts from query
-        from src.search.query_analyzer import QueryAnalyzer
-        from src.search.concept_scorer import ConceptScorer
-        
         query_concepts = QueryAnalyzer.detect_concepts(query)
+        query_concept_values = frozenset(concept.value for concept in query_concepts)
         
-        # Boost scores with concept matching
-        for result in results:
-            # Get semantic similarity (1 - distance / 2) for L2 distance
-            semantic_score = 1 - (result.get("distance", 0) / 2) if result.get("distance") is not None else 1.0
-            
-            # Get concepts from result metadata
-            result_concepts = result.get("metadata", {}).get("concepts", [])
-            
-            # Calculate concept score
-            concept_score = ConceptScorer.calculate_concept_score(query_concepts, result_concepts)
-            
-            # Check if has docstring
-            has_docstring = bool(result.get("metadata", {}).get("docstring"))
-            
-            # Calculate boosted score
-            boosted_score = ConceptScorer.boost_score_with_concepts(
-                semantic_score=semantic_score,
-                concept_score=concept_score,
-                has_docstring=has_docstring
-            )
-            
-            # Store both scores
+        # Get semantic similarity (1 - distance / 2) for L2 distance
+        semantic_scores = similarity_scores([result.get("distance") for result in results])
+        
+        # Boost scores with concept matching, for all results at once
+        concept_scores = np.fromiter(
+            (
+                ConceptScorer.calculate_concept_value_score(
+                    query_concept_values, result.get("metadata", {}).get("concepts", [])
+                )
+                for result in results
+            ),
+            dtype=np.float64,
+            count=len(results),
+        )
+        has_docstring = np.fromiter(
+            (bool(result.get("metadata", {}).get("docstring")) for result in results),
+            dtype=bool,
+            count=len(results),
+        )
+        final_scores = ConceptScorer.boost_scores(semantic_scores, concept_scores, has_docstring)
+        
+        # Store all scores, updating distance to reflect the boosted score
+        for result, semantic_score, concept_score, final_score, distance in zip(
+            results,
+            semantic_scores.tolist(),
+            concept_scores.tolist(),
+            final_scores.tolist(),
+            (1 - final_scores).tolist(),
+        ):
             result["semantic_score"] = semantic_score
             result["concept_score"] = concept_score
-            result["final_score"] = boosted_score
-            
-            # Update distance to reflect boosted score
-            result["distance"] = 1 - boosted_score
+            result["final_score"] = final_score
+            result["distance"] = distance
         
         # Re-sort by final score (descending)
         results.sort(key=lambda x: x.get("final_score", 0), reverse=True)
         
-        # Post-retrieval aggregation
-        from src.search.result_aggregator import ResultAggregator
-        
-        # Aggregate and deduplicate results
+        # Post-retrieval aggregation: aggregate and deduplicate results
         aggregated_results = ResultAggregator.aggregate_results(results, max_results=limit)
         
         # Merge context for better understanding
         final_results = ResultAggregator.merge_context(aggregated_results)
 
-        logger.info(f"Found {len(final_results)} results after aggregation")
+        logger.info("Found %d results after aggregation", len(final_results))
         return final_results
 
     def find_similar(
@@ -149,42 +209,60 @@ class SemanticSearch:
         Returns:
             List of similar code units
         """
-        logger.info(f"Finding code similar to {code_name} in {file_path}")
-
-        # Search for the original code unit
-        results = self.vector_store.search(
-            query_embedding=[0.0] * settings.embedding_dimension,  # Dummy embedding
-            limit=1000,  # Get many results to filter
-        )
+        logger.info("Finding code similar to %s in %s", code_name, file_path)
 
-        # Find the specific code unit
-        target_unit = None
-        for result in results:
-            if (
-                result["metadata"]["file_path"] == file_path
-                and result["metadata"]["name"] == code_name
-            ):
-                target_unit = result
-                break
+        # Look up the original code unit by its metadata
+        target_unit = self.vector_store.get_by_metadata(file_path, code_name)
 
         if not target_unit:
-            logger.warning(f"Code unit not found: {code_name} in {file_path}")
+            logger.warning("Code unit not found: %s in %s", code_name, file_path)
             return []
 
         # Use the document text to find similar code
         similar_results = self.search(target_unit["document"], limit=limit + 1)
 
-        # Remove the original code unit from results
-        similar_results = [
-            r for r in similar_results
+        return self._exclude_target(similar_results, file_path, code_name, limit)
+
+    async def afind_similar(
+        self, file_path: str, code_name: str, limit: int = 5
+    ) -> List[Dict[str, Any]]:
+        """Async variant of find_similar.
+
+        Args:
+            file_path: Path to file containing the code
+            code_name: Name of the function or class
+            limit: Maximum number of results
+
+        Returns:
+            List of similar code units
+        """
+        logger.info("Finding code similar to %s in %s", code_name, file_path)
+
+        target_unit = await asyncio.to_thread(
+            self.vector_store.get_by_metadata, file_path, code_name
+        )
+
+        if not target_unit:
+            logger.warning("Code unit not found: %s in %s", code_name, file_path)
+            return []
+
+        similar_results = await self.asearch(target_unit["document"], limit=limit + 1)
+
+        return self._exclude_target(similar_results, file_path, code_name, limit)
+
+    @staticmethod
+    def _exclude_target(
+        results: List[Dict[str, Any]], file_path: str, code_name: str, limit: int
+    ) -> List[Dict[str, Any]]:
+        """Remove the original code unit from similarity results."""
+        return [
+            r for r in results
             if not (
                 r["metadata"]["file_path"] == file_path
                 and r["metadata"]["name"] == code_name
             )
         ][:limit]
 
-        return similar_results
-
     def summarize_results(self, query: str, results: List[Dict[str, Any]]) -> str:
         """Generate a summary of search results.
         
@@ -1,24 +1,69 @@
 """Helper functions for displaying search results."""
 
+import bisect
+import heapq
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
+_WORD_RE = re.compile(r'\w+')
 
-def extract_relevant_lines(code: str, query: str, max_lines: int = 5) -> List[str]:
+# Line markers earning a relevance bonus
+_DEFINITION_MARKER_RE = re.compile(r'def |class |function |public |private ')
+_COMMENT_MARKER_RE = re.compile(r'"""|\'\'\'|//|/\*|\*')
+_NEWLINE_RE = re.compile(r'\n')
+
+
+def _keyword_scores(code_lower: str, keywords: List[str]) -> List[int]:
+    """Score each line of lowercased code by the keywords it contains.
+
+    Each keyword is located with str.find over the whole code, jumping to the
+    next line after a hit, so the work grows with the number of matching lines
+    rather than with lines times keywords.
+
+    Args:
+        code_lower: Lowercased code
+        keywords: Lowercased query keywords
+
+    Returns:
+        Keyword score of every line, 10 per keyword found in it
+    """
+    line_ends = [match.start() for match in _NEWLINE_RE.finditer(code_lower)]
+    line_ends.append(len(code_lower))
+    scores = [0] * len(line_ends)
+    
+    for keyword in keywords:
+        pos = code_lower.find(keyword)
+        while pos != -1:
+            line = bisect.bisect_left(line_ends, pos)
+            scores[line] += 10
+            pos = code_lower.find(keyword, line_ends[line] + 1)
+    
+    return scores
+
+
+def extract_relevant_lines(
+    code: str, query: str, max_lines: int = 5, lines: Optional[List[str]] = None
+) -> List[str]:
     """Extract the most relevant lines from code based on query.
     
     Args:
         code: Full code content
         query: Search query
         max_lines: Maximum number of lines to return
+        lines: code split into lines, if the caller already has them
         
     Returns:
         List of relevant code lines
     """
-    lines = code.split('\n')
+    if lines is None:
+        lines = code.split('\n')
     
     # Extract keywords from query
-    keywords = [word.lower() for word in re.findall(r'\w+', query)]
+    keywords = [word.lower() for word in _WORD_RE.findall(query)]
+    
+    # Count keyword matches; lowercasing never adds or removes newlines, so the
+    # lines of the lowercased code are the lines of the code
+    keyword_scores = _keyword_scores(code.lower(), keywords)
     
     # Score each line based on keyword matches
     scored_lines = []
@@ -26,29 +71,20 @@ def extract_relevant_lines(code: str, query: str, max_lines: int = 5) -> List[st
         if not line.strip():
             continue
             
-        line_lower = line.lower()
-        score = 0
-        
-        # Count keyword matches
-        for keyword in keywords:
-            if keyword in line_lower:
-                score += 10
+        score = keyword_scores[i]
         
         # Bonus for function/class definitions
-        if any(pattern in line for pattern in ['def ', 'class ', 'function ', 'public ', 'private ']):
+        if _DEFINITION_MARKER_RE.search(line):
             score += 5
             
         # Bonus for comments/docstrings
-        if any(pattern in line for pattern in ['"""', "'''", '//', '/*', '*']):
+        if _COMMENT_MARKER_RE.search(line):
             score += 2
             
         scored_lines.append((score, i, line))
     
-    # Sort by score (descending) and line number (ascending for ties)
-    scored_lines.sort(key=lambda x: (-x[0], x[1]))
-    
-    # Get top lines
-    top_lines = scored_lines[:max_lines]
+    # Get top lines by score (descending) and line number (ascending for ties)
+    top_lines = heapq.nsmallest(max_lines, scored_lines, key=lambda x: (-x[0], x[1]))
     
     # Sort by line number for display
     top_lines.sort(key=lambda x: x[1])
@@ -68,11 +104,12 @@ def format_code_preview(code: str, query: str, max_lines: int = 5) -> str:
     Returns:
         Formatted code preview string
     """
-    relevant_lines = extract_relevant_lines(code, query, max_lines)
+    lines = code.split('\n')
+    relevant_lines = extract_relevant_lines(code, query, max_lines, lines=lines)
     
     if not relevant_lines:
         # Fallback to first few lines
-        lines = [l for l in code.split('\n')[:max_lines] if l.strip()]
+        lines = [l for l in lines[:max_lines] if l.strip()]
         return '\n'.join(f"      {line[:75]}" for line in lines)
     
     # Format with line content
@@ -1,7 +1,52 @@
 """Automatic programming language detection from code snippets."""
 
 import re
-from typing import Optional
+from typing import List, Optional, Pattern, Tuple
+
+# Weighted regex features of each language, each scored if present, with a
+# literal the pattern requires (None if there is none). A pattern starting with
+# \b cannot use the regex engine's literal prefix search, so checking for the
+# literal first spares a full scan of the code for every absent feature.
+# Substring features are scored by the _score_* methods.
+_PYTHON_PATTERNS = (
+    ('def', re.compile(r'\bdef\s+\w+\s*\('), 10),
+    ('class', re.compile(r'\bclass\s+\w+'), 10),
+    ('import', re.compile(r'\bimport\s+\w+'), 5),
+    ('from', re.compile(r'\bfrom\s+\w+\s+import'), 5),
+    (':', re.compile(r':\s*$', re.MULTILINE), 3),  # Colon at end of line
+    ('"""', re.compile(r'""".*?"""', re.DOTALL), 5),  # Docstrings
+    ("'''", re.compile(r"'''.*?'''", re.DOTALL), 5),
+)
+_JAVASCRIPT_PATTERNS = (
+    ('function', re.compile(r'\bfunction\s+\w+\s*\('), 10),
+    ('const', re.compile(r'\bconst\s+\w+'), 8),
+    ('let', re.compile(r'\blet\s+\w+'), 8),
+    ('var', re.compile(r'\bvar\s+\w+'), 5),
+    ('console.log(', re.compile(r'\bconsole\.log\('), 5),
+    ('async', re.compile(r'\basync\s+function'), 5),
+    ('await', re.compile(r'\bawait\s+'), 3),
+)
+_JAVA_PATTERNS = (
+    ('public', re.compile(r'\bpublic\s+class\s+\w+'), 15),
+    ('private', re.compile(r'\bprivate\s+\w+'), 5),
+    ('protected', re.compile(r'\bprotected\s+\w+'), 5),
+    ('main', re.compile(r'\bpublic\s+static\s+void\s+main'), 15),
+    ('System.out.println(', re.compile(r'\bSystem\.out\.println\('), 10),
+    ('extends', re.compile(r'\bextends\s+\w+'), 5),
+    ('implements', re.compile(r'\bimplements\s+\w+'), 5),
+    ('new', re.compile(r'\bnew\s+\w+\('), 3),
+    # Type declarations
+    (None, re.compile(r'\b(String|int|boolean|void|double|float)\s+\w+'), 5),
+)
+_GO_PATTERNS = (
+    ('func', re.compile(r'\bfunc\s+\w+\s*\('), 15),
+    ('package', re.compile(r'\bpackage\s+\w+'), 10),
+    ('struct', re.compile(r'\btype\s+\w+\s+struct'), 10),
+    ('fmt.Print', re.compile(r'\bfmt\.Print'), 5),
+    ('func', re.compile(r'\bfunc\s+\(\w+\s+\*?\w+\)'), 8),  # Method receivers
+    ('defer', re.compile(r'\bdefer\s+'), 5),
+    ('go', re.compile(r'\bgo\s+\w+\('), 5),  # Goroutines
+)
 
 
 class LanguageDetector:
@@ -22,48 +67,54 @@ class LanguageDetector:
         if not code:
             return None
         
-        # Score each language
-        scores = {
-            'python': LanguageDetector._score_python(code),
-            'javascript': LanguageDetector._score_javascript(code),
-            'java': LanguageDetector._score_java(code),
-            'go': LanguageDetector._score_go(code)
-        }
-        
-        # Get language with highest score
-        max_score = max(scores.values())
-        
-        if max_score == 0:
-            return None
-        
-        for lang, score in scores.items():
-            if score == max_score:
-                return lang
-        
-        return None
+        # Substring features score exactly; a pattern can only match if its
+        # literal occurs in the code
+        languages = (
+            ('python', _PYTHON_PATTERNS, LanguageDetector._score_python(code)),
+            ('javascript', _JAVASCRIPT_PATTERNS, LanguageDetector._score_javascript(code)),
+            ('java', _JAVA_PATTERNS, LanguageDetector._score_java(code)),
+            ('go', _GO_PATTERNS, LanguageDetector._score_go(code)),
+        )
+        candidates = []
+        for order, (lang, patterns, feature_score) in enumerate(languages):
+            possible = LanguageDetector._possible_patterns(code, patterns)
+            max_score = feature_score + sum(weight for _, weight in possible)
+            candidates.append((max_score, order, lang, possible, feature_score))
+        
+        # Score languages from the highest possible score down, stopping once no
+        # remaining language can beat the best score, or tie it from earlier in
+        # the list (ties go to the first language)
+        candidates.sort(key=lambda candidate: (-candidate[0], candidate[1]))
+        best_lang, best_score, best_order = None, 0, len(languages)
+        for max_score, order, lang, possible, feature_score in candidates:
+            if max_score < best_score or (max_score == best_score and order > best_order):
+                break
+            score = feature_score + sum(
+                weight for pattern, weight in possible if pattern.search(code)
+            )
+            if score > best_score or (score == best_score > 0 and order < best_order):
+                best_lang, best_score, best_order = lang, score, order
+        
+        return best_lang
+    
+    @staticmethod
+    def _possible_patterns(
+        code: str, patterns: Tuple[Tuple[Optional[str], Pattern, int], ...]
+    ) -> List[Tuple[Pattern, int]]:
+        """Get the patterns whose literal occurs in the code, with their weights."""
+        return [
+            (pattern, weight)
+            for literal, pattern, weight in patterns
+            if literal is None or literal in code
+        ]
     
     @staticmethod
     def _score_python(code: str) -> int:
-        """Score likelihood of Python code."""
+        """Score the substring features of Python code."""
         score = 0
         
-        # Python-specific keywords
-        if re.search(r'\bdef\s+\w+\s*\(', code):
-            score += 10
-        if re.search(r'\bclass\s+\w+', code):
-            score += 10
-        if re.search(r'\bimport\s+\w+', code):
-            score += 5
-        if re.search(r'\bfrom\s+\w+\s+import', code):
-            score += 5
-        if re.search(r':\s*$', code, re.MULTILINE):  # Colon at end of line
-            score += 3
         if 'self' in code:
             score += 3
-        if re.search(r'""".*?"""', code, re.DOTALL):  # Docstrings
-            score += 5
-        if re.search(r"'''.*?'''", code, re.DOTALL):
-            score += 5
         
         # Python indentation (no braces)
         if '{' not in code and '}' not in code:
@@ -73,26 +124,11 @@ class LanguageDetector:
     
     @staticmethod
     def _score_javascript(code: str) -> int:
-        """Score likelihood of JavaScript/TypeScript code."""
+        """Score the substring features of JavaScript/TypeScript code."""
         score = 0
         
-        # JavaScript-specific keywords
-        if re.search(r'\bfunction\s+\w+\s*\(', code):
-            score += 10
-        if re.search(r'\bconst\s+\w+', code):
-            score += 8
-        if re.search(r'\blet\s+\w+', code):
-            score += 8
-        if re.search(r'\bvar\s+\w+', code):
-            score += 5
         if '=>' in code:  # Arrow functions
             score += 10
-        if re.search(r'\bconsole\.log\(', code):
-            score += 5
-        if re.search(r'\basync\s+function', code):
-            score += 5
-        if re.search(r'\bawait\s+', code):
-            score += 3
         
         # Braces
         if '{' in code and '}' in code:
@@ -106,31 +142,9 @@ class LanguageDetector:
     
     @staticmethod
     def _score_java(code: str) -> int:
-        """Score likelihood of Java code."""
+        """Score the substring features of Java code."""
         score = 0
         
-        # Java-specific keywords
-        if re.search(r'\bpublic\s+class\s+\w+', code):
-            score += 15
-        if re.search(r'\bprivate\s+\w+', code):
-            score += 5
-        if re.search(r'\bprotected\s+\w+', code):
-            score += 5
-        if re.search(r'\bpublic\s+static\s+void\s+main', code):
-            score += 15
-        if re.search(r'\bSystem\.out\.println\(', code):
-            score += 10
-        if re.search(r'\bextends\s+\w+', code):
-            score += 5
-        if re.search(r'\bimplements\s+\w+', code):
-            score += 5
-        if re.search(r'\bnew\s+\w+\(', code):
-            score += 3
-        
-        # Type declarations
-        if re.search(r'\b(String|int|boolean|void|double|float)\s+\w+', code):
-            score += 5
-        
         # Braces and semicolons
         if '{' in code and '}' in code and ';' in code:
             score += 2
@@ -139,26 +153,11 @@ class LanguageDetector:
     
     @staticmethod
     def _score_go(code: str) -> int:
-        """Score likelihood of Go code."""
+        """Score the substring features of Go code."""
         score = 0
         
-        # Go-specific keywords
-        if re.search(r'\bfunc\s+\w+\s*\(', code):
-            score += 15
-        if re.search(r'\bpackage\s+\w+', code):
-            score += 10
-        if re.search(r'\btype\s+\w+\s+struct', code):
-            score += 10
         if ':=' in code:  # Short variable declaration
             score += 10
-        if re.search(r'\bfmt\.Print', code):
-            score += 5
-        if re.search(r'\bfunc\s+\(\w+\s+\*?\w+\)', code):  # Method receivers
-            score += 8
-        if re.search(r'\bdefer\s+', code):
-            score += 5
-        if re.search(r'\bgo\s+\w+\(', code):  # Goroutines
-            score += 5
         
         # Braces
         if '{' in code and '}' in code:
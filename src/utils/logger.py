@@ -2,18 +2,25 @@
 
 import logging
 import sys
+import time
 from typing import Any, Dict
-import json
-from datetime import datetime
+
+import orjson
 
 
 class JSONFormatter(logging.Formatter):
     """Custom JSON formatter for structured logging."""
 
+    def __init__(self):
+        super().__init__()
+        # UTC timestamp prefix of the last formatted second
+        self._second = -1
+        self._second_prefix = ""
+
     def format(self, record: logging.LogRecord) -> str:
         """Format log record as JSON."""
         log_data: Dict[str, Any] = {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": self._timestamp(record.created),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
@@ -26,7 +33,18 @@ class JSONFormatter(logging.Formatter):
         if hasattr(record, "extra_fields"):
             log_data.update(record.extra_fields)
 
-        return json.dumps(log_data)
+        return orjson.dumps(log_data, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def _timestamp(self, created: float) -> str:
+        """Format a record time as ISO 8601 UTC with milliseconds.
+
+        The part up to the seconds is only formatted once per second.
+        """
+        second = int(created)
+        if second != self._second:
+            self._second_prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+            self._second = second
+        return f"{self._second_prefix}.{int((created - second) * 1000):03d}Z"
 
 
 class TextFormatter(logging.Formatter):
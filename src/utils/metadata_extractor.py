@@ -4,23 +4,58 @@ import re
 import ast
 from typing import List, Dict, Any, Optional
 
+# Decision points counted by calculate_complexity, most frequent first so that
+# large units reach the complexity cap after as few scans as possible
+_DECISION_KEYWORDS = ('or', 'if', 'for', 'and', 'case', 'while', 'except', 'catch', '&&', '||')
+
+_JS_REQUIRE_RE = re.compile(r'require\(["\']([^"\']+)["\']\)')
+_JS_IMPORT_FROM_RE = re.compile(r'import\s+.*?from\s+["\']([^"\']+)["\']')
+_JS_IMPORT_RE = re.compile(r'import\s+["\']([^"\']+)["\']')
+_JAVA_IMPORT_RE = re.compile(r'import\s+([\w.]+);')
+_GO_IMPORT_SINGLE_RE = re.compile(r'import\s+"([^"]+)"')
+_GO_IMPORT_BLOCK_RE = re.compile(r'import\s*\((.*?)\)', re.DOTALL)
+_GO_IMPORT_PATH_RE = re.compile(r'"([^"]+)"')
+_PARAM_PARENS_RE = re.compile(r'\(([^)]*)\)')
+_CLASS_RE = re.compile(r'class\s+(\w+)')
+_JAVA_CLASS_RE = re.compile(r'(?:public|private|protected)?\s*class\s+(\w+)')
+# Every line _JAVA_CLASS_RE matches starts with one of these
+_JAVA_CLASS_PREFIXES = ('class', 'public', 'private', 'protected')
+
+# Receiver parameter names left out of parameter lists
+_SKIP_PARAMS = frozenset(('self', 'this', 'cls'))
+
 
 class MetadataExtractor:
     """Extract rich metadata from code."""
     
     @staticmethod
-    def extract_python_imports(code: str) -> List[str]:
-        """Extract import statements from Python code."""
+    def extract_python_imports(code: str, tree: Optional[ast.AST] = None) -> List[str]:
+        """Extract import statements from Python code.
+
+        Only statements are visited, since imports never occur inside expressions.
+
+        Args:
+            code: Python source code
+            tree: Already parsed syntax tree of the code, if available
+        """
         imports = []
         try:
-            tree = ast.parse(code)
-            for node in ast.walk(tree):
+            if tree is None:
+                tree = ast.parse(code)
+            nodes = [tree]
+            while nodes:
+                node = nodes.pop()
                 if isinstance(node, ast.Import):
                     for alias in node.names:
                         imports.append(alias.name)
                 elif isinstance(node, ast.ImportFrom):
                     if node.module:
                         imports.append(node.module)
+                else:
+                    nodes.extend(
+                        child for child in ast.iter_child_nodes(node)
+                        if not isinstance(child, ast.expr)
+                    )
         except:
             pass
         return list(set(imports))
@@ -31,15 +66,15 @@ class MetadataExtractor:
         imports = []
         
         # require('module')
-        for match in re.finditer(r'require\(["\']([^"\']+)["\']\)', code):
+        for match in _JS_REQUIRE_RE.finditer(code):
             imports.append(match.group(1))
         
         # import ... from 'module'
-        for match in re.finditer(r'import\s+.*?from\s+["\']([^"\']+)["\']', code):
+        for match in _JS_IMPORT_FROM_RE.finditer(code):
             imports.append(match.group(1))
         
         # import 'module'
-        for match in re.finditer(r'import\s+["\']([^"\']+)["\']', code):
+        for match in _JS_IMPORT_RE.finditer(code):
             imports.append(match.group(1))
         
         return list(set(imports))
@@ -48,7 +83,7 @@ class MetadataExtractor:
     def extract_java_imports(code: str) -> List[str]:
         """Extract import statements from Java."""
         imports = []
-        for match in re.finditer(r'import\s+([\w.]+);', code):
+        for match in _JAVA_IMPORT_RE.finditer(code):
             imports.append(match.group(1))
         return list(set(imports))
     
@@ -58,13 +93,13 @@ class MetadataExtractor:
         imports = []
         
         # Single import
-        for match in re.finditer(r'import\s+"([^"]+)"', code):
+        for match in _GO_IMPORT_SINGLE_RE.finditer(code):
             imports.append(match.group(1))
         
         # Multi-line import
-        import_block = re.search(r'import\s*\((.*?)\)', code, re.DOTALL)
+        import_block = _GO_IMPORT_BLOCK_RE.search(code)
         if import_block:
-            for match in re.finditer(r'"([^"]+)"', import_block.group(1)):
+            for match in _GO_IMPORT_PATH_RE.finditer(import_block.group(1)):
                 imports.append(match.group(1))
         
         return list(set(imports))
@@ -76,11 +111,13 @@ class MetadataExtractor:
         Counts decision points: if, for, while, case, catch, &&, ||
         """
         complexity = 1  # Base complexity
+        code_lower = code.lower()
         
-        # Count decision keywords
-        keywords = ['if', 'for', 'while', 'case', 'catch', 'except', '&&', '||', 'and', 'or']
-        for keyword in keywords:
-            complexity += code.lower().count(keyword)
+        # Count decision keywords, stopping once the cap is reached
+        for keyword in _DECISION_KEYWORDS:
+            complexity += code_lower.count(keyword)
+            if complexity >= 50:
+                break
         
         return min(complexity, 50)  # Cap at 50
     
@@ -93,7 +130,7 @@ class MetadataExtractor:
         params = []
         
         # Extract content between parentheses
-        match = re.search(r'\(([^)]*)\)', signature)
+        match = _PARAM_PARENS_RE.search(signature)
         if not match:
             return []
         
@@ -110,20 +147,18 @@ class MetadataExtractor:
             # Extract just the parameter name
             if language == 'python':
                 # Handle: name, name: type, name = default
-                param = param.split(':')[0].split('=')[0].strip()
+                param = param.partition(':')[0].partition('=')[0].strip()
             elif language in ['javascript', 'typescript']:
                 # Handle: name, name: type, name = default
-                param = param.split(':')[0].split('=')[0].strip()
+                param = param.partition(':')[0].partition('=')[0].strip()
             elif language == 'java':
                 # Handle: Type name
-                parts = param.split()
-                param = parts[-1] if parts else param
+                param = param.rsplit(None, 1)[-1]
             elif language == 'go':
                 # Handle: name Type
-                parts = param.split()
-                param = parts[0] if parts else param
+                param = param.split(None, 1)[0]
             
-            if param and param not in ['self', 'this', 'cls']:
+            if param and param not in _SKIP_PARAMS:
                 params.append(param)
         
         return params
@@ -142,24 +177,58 @@ class MetadataExtractor:
         return False
     
     @staticmethod
-    def extract_class_name(file_content: str, method_line: int, language: str) -> Optional[str]:
-        """Extract the class name that contains a method."""
-        lines = file_content.split('\n')
+    def extract_all(code: str, signature: Optional[str], language: str) -> Dict[str, Any]:
+        """Compute the per-unit metadata stored with every code unit.
+
+        Args:
+            code: Source code of the unit
+            signature: Signature of the unit, if any
+            language: Programming language
+
+        Returns:
+            Dictionary with 'complexity', 'has_docs' and 'param_count'
+        """
+        return {
+            'complexity': MetadataExtractor.calculate_complexity(code),
+            'has_docs': MetadataExtractor.has_docstring(code, language),
+            'param_count': len(MetadataExtractor.extract_parameters(signature or '', language)),
+        }
+    
+    @staticmethod
+    def extract_class_name(
+        file_content: str,
+        method_line: int,
+        language: str,
+        lines: Optional[List[str]] = None,
+    ) -> Optional[str]:
+        """Extract the class name that contains a method.
+
+        Args:
+            file_content: Source code of the file
+            method_line: Line number of the method
+            language: Programming language
+            lines: file_content split into lines, if the caller already has them
+
+        Returns:
+            Name of the closest class declared above the method, or None
+        """
+        if language in ('python', 'javascript', 'typescript'):
+            prefixes, pattern = 'class', _CLASS_RE
+        elif language == 'java':
+            prefixes, pattern = _JAVA_CLASS_PREFIXES, _JAVA_CLASS_RE
+        else:
+            return None
         
-        # Search backwards from method line
+        if lines is None:
+            lines = file_content.split('\n')
+        
+        # Search backwards from method line; the prefix check rejects most
+        # lines without running the pattern
         for i in range(method_line - 1, max(0, method_line - 50), -1):
             line = lines[i].strip()
             
-            if language == 'python':
-                match = re.match(r'class\s+(\w+)', line)
-                if match:
-                    return match.group(1)
-            elif language in ['javascript', 'typescript']:
-                match = re.match(r'class\s+(\w+)', line)
-                if match:
-                    return match.group(1)
-            elif language == 'java':
-                match = re.match(r'(?:public|private|protected)?\s*class\s+(\w+)', line)
+            if line.startswith(prefixes):
+                match = pattern.match(line)
                 if match:
                     return match.group(1)
         
@@ -0,0 +1,20 @@
+"""Vectorized conversions from vector-store distances to similarity scores."""
+
+from typing import Optional, Sequence
+
+import numpy as np
+
+
+def similarity_scores(distances: Sequence[Optional[float]]) -> np.ndarray:
+    """Convert distances to similarity scores (1 - distance / 2).
+
+    Args:
+        distances: Distances reported by the vector store; None means unknown
+
+    Returns:
+        Array of similarity scores, 1.0 where the distance is unknown
+    """
+    values = np.array(
+        [np.nan if d is None else d for d in distances], dtype=np.float64
+    )
+    return np.where(np.isnan(values), 1.0, 1.0 - values / 2.0)
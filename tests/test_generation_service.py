@@ -0,0 +1,51 @@
+"""Tests for the generation service."""
+
+import asyncio
+import dataclasses
+import time
+
+import pytest
+
+from src.config import settings
+from src.generation import generation_service
+from src.generation.generation_service import BaseGenerationProvider, GenerationService
+
+
+class FakeProvider(BaseGenerationProvider):
+    """Provider answering after a fixed delay with a blocking call."""
+
+    def __init__(self, answer: str, delay: float):
+        self.answer = answer
+        self.delay = delay
+
+    def generate_content(self, prompt: str) -> str:
+        time.sleep(self.delay)
+        return self.answer
+
+
+@pytest.fixture
+def hedged_service(monkeypatch):
+    """A service whose slow primary is hedged with an instant fallback."""
+    hedged_settings = dataclasses.replace(settings, generation_hedge_delay=0.1)
+    monkeypatch.setattr(generation_service, "settings", hedged_settings)
+    service = GenerationService.__new__(GenerationService)
+    service.provider = FakeProvider("slow", delay=2.0)
+    service.fallback_providers = [FakeProvider("fast", delay=0.0)]
+    return service
+
+
+def test_hedged_fallback_answers_without_waiting_for_the_primary(hedged_service):
+    start = time.perf_counter()
+    answer = hedged_service._generate_with_fallback("prompt")
+
+    assert answer == "fast"
+    assert time.perf_counter() - start < 1.0
+
+
+def test_generate_from_a_running_event_loop(hedged_service):
+    async def caller() -> str:
+        return hedged_service._generate_with_fallback("prompt")
+
+    start = time.perf_counter()
+    assert asyncio.run(caller()) == "fast"
+    assert time.perf_counter() - start < 1.0
@@ -0,0 +1,45 @@
+"""Tests for the manifest of indexed files."""
+
+import os
+
+import pytest
+
+from src.indexer.indexed_files import IndexedFiles
+
+
+@pytest.fixture
+def indexed_files(tmp_path):
+    return IndexedFiles(str(tmp_path / "indexed_files.json"), namespace="test")
+
+
+def test_new_and_changed_files_are_reported(tmp_path, indexed_files):
+    source = tmp_path / "app.py"
+    source.write_text("x = 1\n")
+
+    fingerprint = indexed_files.check(str(source))
+    assert fingerprint is not None
+    indexed_files.update({str(source): fingerprint})
+
+    source.write_text("x = 2\n")
+    os.utime(source, ns=(fingerprint[0] + 10**9, fingerprint[0] + 10**9))
+    assert indexed_files.check(str(source)) is not None
+
+
+def test_unchanged_files_are_skipped(tmp_path, indexed_files):
+    source = tmp_path / "app.py"
+    source.write_text("x = 1\n")
+    fingerprint = indexed_files.check(str(source))
+    indexed_files.update({str(source): fingerprint})
+
+    assert indexed_files.check(str(source)) is None
+    # Touched but with the same content
+    os.utime(source, ns=(fingerprint[0] + 10**9, fingerprint[0] + 10**9))
+    assert indexed_files.check(str(source)) is None
+
+
+def test_unreadable_files_are_skipped(tmp_path, indexed_files):
+    link = tmp_path / "broken.py"
+    link.symlink_to(tmp_path / "missing.py")
+
+    assert indexed_files.check(str(link)) is None
+    assert indexed_files.check(str(tmp_path / "deleted.py")) is None
@@ -0,0 +1,93 @@
+"""Tests for the JavaScript parser."""
+
+import pytest
+
+from src.parser import javascript_parser
+from src.parser.javascript_parser import JavaScriptParser
+from src.parser.tree_sitter_support import get_tree_sitter_parser
+
+CALLBACKS_SOURCE = """\
+app.get('/users', function listUsers(req, res) {
+  res.send([]);
+});
+
+describe('users', function suiteBody() {
+  it('lists users', () => {});
+});
+
+class Repo {
+  async find(id) {
+    return this.db.get(id);
+  }
+}
+"""
+
+
+@pytest.fixture
+def regex_parser(monkeypatch):
+    """A parser that uses the regex fallback instead of tree-sitter."""
+    monkeypatch.setattr(javascript_parser, "get_tree_sitter_parser", lambda language: None)
+    return JavaScriptParser()
+
+
+@pytest.fixture
+def tree_sitter_parser():
+    """A parser that uses tree-sitter, when the grammar is installed."""
+    if get_tree_sitter_parser("javascript") is None:
+        pytest.skip("tree-sitter JavaScript grammar is not available")
+    return JavaScriptParser()
+
+
+def _units(parser, content):
+    return {(unit.type, unit.name): unit for unit in parser.parse_source(content, "app.js")}
+
+
+def test_named_callbacks_are_extracted(regex_parser):
+    units = _units(regex_parser, CALLBACKS_SOURCE)
+
+    assert ("function", "listUsers") in units
+    assert ("function", "suiteBody") in units
+    assert units[("function", "listUsers")].start_line == 1
+    assert units[("function", "listUsers")].end_line == 3
+    assert ("method", "find") in units
+    # Calls are not class methods
+    assert ("method", "get") not in units
+    assert ("method", "describe") not in units
+
+
+def test_named_callbacks_are_extracted_with_tree_sitter(tree_sitter_parser):
+    source = CALLBACKS_SOURCE + "const handler = function onEvent(event) {};\n"
+    units = _units(tree_sitter_parser, source)
+
+    assert ("function", "listUsers") in units
+    assert ("function", "suiteBody") in units
+    assert ("method", "find") in units
+    # A function expression assigned to a variable is reported once, by the variable
+    assert ("function", "handler") in units
+    assert ("function", "onEvent") not in units
+
+
+def test_braces_in_strings_do_not_end_a_class(regex_parser):
+    source = """\
+class Store {
+  constructor() {
+    this.open = "}";
+    this.label = `${this.open} } ${ {a: 1}.a }`;
+    // a stray } in a comment
+    this.pattern = /[}]/g;
+  }
+  create(item) {
+    return `item ${item.id}: {`;
+  }
+  load(id) {
+    return this.items[id];
+  }
+}
+"""
+    units = _units(regex_parser, source)
+
+    assert units[("class", "Store")].end_line == 14
+    assert units[("method", "constructor")].end_line == 7
+    assert ("method", "create") in units
+    assert units[("method", "load")].start_line == 11
+    assert units[("method", "load")].end_line == 13